@@ -14,13 +14,15 @@ import os
 from generate_js import Generator as JavascriptGenerator
 from generate_json import Generator as JSONGenerator
 from generate_mm import Generator as MindmapGenerator
-from generate_ids_level_1 import Generator as Level1IdentifierGenerator
-from generate_ids_level_2 import Generator as Level2IdentifierGenerator
-from generate_ids_level_3 import Generator as Level3IdentifierGenerator
+from generate_ids import Generator as IdentifierGenerator
+from generate_sqlite import Generator as SQLiteGenerator
 from utils_factory import get_specialization
 from utils_factory import get_short_tables
+from utils_json import set_backend as set_json_backend
 from utils_loader import get_modules
 from utils_loader import get_short_tables_definitions
+from utils_parser import SpecializationParserGroup
+from utils_snapshot import get_specialization_snapshot
 
 
 
@@ -32,43 +34,58 @@ _GENERATORS = {
     'js': JavascriptGenerator,
     'json': JSONGenerator,
     'mm': MindmapGenerator,
-    'ids-level-1': Level1IdentifierGenerator,
-    'ids-level-2': Level2IdentifierGenerator,
-    'ids-level-3': Level3IdentifierGenerator
+    'ids': IdentifierGenerator,
+    'sqlite': SQLiteGenerator
 }
 
-# Map of generator types to encoding type.
+# Map of generator types to output types - other generators produce a single output of their own type.
+_OUTPUT_TYPES = {
+    'ids': ('ids-level-1', 'ids-level-2', 'ids-level-3')
+}
+
+# Map of output types to generator types - for outputs that can be individually targeted.
+_OUTPUT_GENERATORS = {j: i for i in _OUTPUT_TYPES for j in _OUTPUT_TYPES[i]}
+
+# Map of output types to encoding type.
 _ENCODINGS = {
     'ids-level-1': 'csv',
     'ids-level-2': 'csv',
-    'ids-level-3': 'csv'
+    'ids-level-3': 'csv',
+    'sqlite': 'db'
 }
 
-# Map of generator types to file prefixes.
+# Map of output types to file prefixes.
 _FILE_PREFIXES = {
     'js': '_',
     'json': '_',
     'mm': '_',
     'ids-level-1': '_',
     'ids-level-2': '_',
-    'ids-level-3': '_'
+    'ids-level-3': '_',
+    'sqlite': '_'
 }
 
-# Map of generator types to file suffixes.
+# Map of output types to file suffixes.
 _FILE_SUFFIXES = {
     'ids-level-1': '-ids-level-1',
     'ids-level-2': '-ids-level-2',
     'ids-level-3': '-ids-level-3'
 }
 
-# Map of generator types to directories.
+# Map of output types to directories.
 _DIRECTORIES = {
     'js': '',
     'json': '',
     'mm': '',
     'ids-level-1': '',
     'ids-level-2': '',
-    'ids-level-3': ''
+    'ids-level-3': '',
+    'sqlite': ''
+}
+
+# Map of output types to file write modes.
+_WRITE_MODES = {
+    'sqlite': 'wb'
 }
 
 # Set directory from which module is being run.
@@ -104,15 +121,38 @@ _ARGS.add_argument(
     type=str,
     default=os.path.dirname(_DIR)
     )
+_ARGS.add_argument(
+    "--no-snapshot",
+    help="Hydrate specialization from source modules rather than from a snapshot.",
+    dest="no_snapshot",
+    action="store_true"
+    )
+_ARGS.add_argument(
+    "--json-backend",
+    help="JSON encoding backend - output is identical whichever is used.",
+    dest="json_backend",
+    type=str,
+    choices=["auto", "simplejson", "stdlib"],
+    default="auto"
+    )
+_ARGS.add_argument(
+    "--stream",
+    help="Write output of generators that support streaming to file as it is generated.",
+    dest="stream",
+    action="store_true"
+    )
 _ARGS = _ARGS.parse_args()
 
 
 # Validate inputs.
-if _ARGS.typeof != 'all' and _ARGS.typeof not in _GENERATORS.keys():
+if _ARGS.typeof != 'all' and _ARGS.typeof not in _GENERATORS.keys() + _OUTPUT_GENERATORS.keys():
     err = "Unknown generator type [{}].  Validate types = {}."
-    err = err.format(_ARGS.typeof, " | ".join(sorted(_GENERATORS.keys())))
+    err = err.format(_ARGS.typeof, " | ".join(sorted(_GENERATORS.keys() + _OUTPUT_GENERATORS.keys())))
     raise ValueError(err)
 
+# Set JSON encoding backend.
+set_json_backend(_ARGS.json_backend)
+
 # Set specialization filename prefix.
 _FILENAME = _ARGS.scope
 
@@ -120,44 +160,78 @@ _FILENAME = _ARGS.scope
 if _ARGS.typeof == 'all':
     targets = _GENERATORS
 else:
+    generator_type = _OUTPUT_GENERATORS.get(_ARGS.typeof, _ARGS.typeof)
     targets = {
-        _ARGS.typeof: _GENERATORS[_ARGS.typeof]
+        generator_type: _GENERATORS[generator_type]
     }
 
-# Set specialization modules.
-specialization = get_specialization(get_modules(_ARGS.input_dir, _FILENAME))
-
-# Set specialization short tables.
-short_tables = get_short_tables(get_short_tables_definitions(_ARGS.input_dir, _FILENAME))
+# Set specialization & short tables - reusing snapshot if inputs are unchanged.
+if _ARGS.no_snapshot:
+    specialization = get_specialization(get_modules(_ARGS.input_dir, _FILENAME))
+    short_tables = get_short_tables(get_short_tables_definitions(_ARGS.input_dir, _FILENAME))
+else:
+    specialization, short_tables = get_specialization_snapshot(_ARGS.input_dir, _FILENAME)
+
+# Set generators & output file paths.
+generators = {k: v(_PROJECT, specialization, short_tables) for k, v in targets.iteritems()}
+outputs = {}
+fpaths = {}
+for generator_type in generators:
+    outputs[generator_type] = _OUTPUT_TYPES.get(generator_type, (generator_type, ))
+    if _ARGS.typeof in outputs[generator_type]:
+        outputs[generator_type] = (_ARGS.typeof, )
+
+    for output_type in outputs[generator_type]:
+        # Set output file name.
+        fname = "{}{}{}.{}".format(
+            _FILE_PREFIXES.get(output_type, ''),
+            _FILENAME,
+            _FILE_SUFFIXES.get(output_type, ''),
+            _ENCODINGS.get(output_type, output_type)
+            )
+        if fname.endswith('.py'):
+            fname = fname.replace("-", "_")
+
+        # Set output file path.
+        fpath = _ARGS.output_dir
+        dpath = _DIRECTORIES.get(output_type, '')
+        for part in dpath.split('/'):
+            fpath = os.path.join(fpath, part)
+        fpaths[output_type] = os.path.join(fpath, fname)
+
+# Set output streams of generators that write output as it is generated.
+streams = {}
+if _ARGS.stream:
+    for generator_type, generator in generators.iteritems():
+        if not hasattr(generator, 'set_output_stream'):
+            continue
+        for output_type in outputs[generator_type]:
+            streams[output_type] = open(fpaths[output_type], _WRITE_MODES.get(output_type, 'w'))
+            if generator_type in _OUTPUT_TYPES:
+                generator.set_output_stream(streams[output_type], output_type)
+            else:
+                generator.set_output_stream(streams[output_type])
+
+# Run generators - walking specialization once & broadcasting parse events.
+try:
+    SpecializationParserGroup(_PROJECT, specialization, short_tables, generators.values()).run()
+finally:
+    for fstream in streams.values():
+        fstream.close()
 
 logging_output = []
-for generator_type, generator_cls in targets.iteritems():
-    # Run generator
-    generator = generator_cls(_PROJECT, specialization, short_tables)
-    generator.run()
-
-    # Set output file name.
-    fname = "{}{}{}.{}".format(
-        _FILE_PREFIXES.get(generator_type, ''),
-        _FILENAME,
-        _FILE_SUFFIXES.get(generator_type, ''),
-        _ENCODINGS.get(generator_type, generator_type)
-        )
-    if fname.endswith('.py'):
-        fname = fname.replace("-", "_")
-
-    # Set output file path.
-    fpath = _ARGS.output_dir
-    dpath = _DIRECTORIES.get(generator_type, '')
-    for part in dpath.split('/'):
-        fpath = os.path.join(fpath, part)
-    fpath = os.path.join(fpath, fname)
-
-    # Write generated output to file system.
-    with open(fpath, 'w') as fstream:
-        fstream.write(generator.get_output())
-
-    logging_output.append((fname.split('.')[-1], fpath))
+for generator_type, generator in generators.iteritems():
+    for output_type in outputs[generator_type]:
+        # Write generated output to file system (unless already streamed).
+        fpath = fpaths[output_type]
+        if output_type not in streams:
+            with open(fpath, _WRITE_MODES.get(output_type, 'w')) as fstream:
+                if generator_type in _OUTPUT_TYPES:
+                    fstream.write(generator.get_output(output_type))
+                else:
+                    fstream.write(generator.get_output())
+
+        logging_output.append((fpath.split('.')[-1], fpath))
 
 
 # Inform user.
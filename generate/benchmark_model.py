@@ -0,0 +1,178 @@
+"""
+.. module:: benchmark_model.py
+   :license: GPL/CeCIL
+   :platform: Unix, Windows
+   :synopsis: Reports memory footprint of hydrated specialization graphs.
+
+.. moduleauthor:: Mark Conway-Greenslade <momipsl@ipsl.jussieu.fr>
+
+
+"""
+import argparse
+import os
+import sys
+import types
+from collections import OrderedDict
+
+from utils import log
+from utils_factory import get_specialization
+from utils_loader import get_modules
+from utils_model import EnumChoiceSpecialization
+from utils_model import EnumSpecialization
+from utils_model import PropertySetSpecialization
+from utils_model import PropertySpecialization
+from utils_model import TopicSpecialization
+
+
+
+# Define command line options.
+_ARGS = argparse.ArgumentParser("Reports memory footprint of hydrated specialization graphs.")
+_ARGS.add_argument(
+    "--typeof",
+    help="Type of specialization being benchmarked.",
+    dest="typeof",
+    type=str,
+    default=os.path.dirname(os.path.dirname(os.path.abspath(__file__))).split("/")[-1][22:]
+    )
+_ARGS.add_argument(
+    "--input",
+    help="Path to a directory in which specializations reside.",
+    dest="input_dir",
+    type=str,
+    default=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    )
+_ARGS.add_argument(
+    "--synthetic-properties",
+    help="Number of properties within synthetic specialization.",
+    dest="synthetic_properties",
+    type=int,
+    default=100000
+    )
+
+# Set of model node types.
+_NODE_TYPES = (
+    EnumChoiceSpecialization,
+    EnumSpecialization,
+    PropertySetSpecialization,
+    PropertySpecialization,
+    TopicSpecialization
+    )
+
+# Set of container types owned by model nodes.
+_CONTAINER_TYPES = (dict, frozenset, list, set, tuple)
+
+
+def get_footprint(root):
+    """Returns memory footprint of a specialization graph.
+
+    N.B. strings are excluded as they are shared with specialization modules.
+
+    :param TopicSpecialization root: Root of specialization graph.
+
+    :returns: 2 member tuple: number of nodes, bytes occupied by nodes & their containers.
+    :rtype: tuple
+
+    """
+    nodes = 0
+    size = 0
+    seen = set()
+    stack = [root]
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+
+        if isinstance(obj, _NODE_TYPES):
+            nodes += 1
+            size += sys.getsizeof(obj)
+            try:
+                size += sys.getsizeof(obj.__dict__)
+                members = obj.__dict__.values()
+            except AttributeError:
+                members = [getattr(obj, i) for i in obj.__slots__ if hasattr(obj, i)]
+            stack += [i for i in members if isinstance(i, _NODE_TYPES + _CONTAINER_TYPES)]
+
+        elif isinstance(obj, _CONTAINER_TYPES):
+            size += sys.getsizeof(obj)
+            members = obj.values() if isinstance(obj, dict) else obj
+            stack += [i for i in members if isinstance(i, _NODE_TYPES + _CONTAINER_TYPES)]
+
+    return nodes, size
+
+
+def get_synthetic_modules(properties, processes=20, sub_processes=50):
+    """Returns modules of a synthetic specialization.
+
+    :param int properties: Number of properties to be specialized.
+    :param int processes: Number of process modules.
+    :param int sub_processes: Number of sub-processes per process.
+
+    :returns: Synthetic specialization modules: root followed by processes.
+    :rtype: list
+
+    """
+    per_sub_process = max(1, properties // (processes * sub_processes))
+
+    root = _get_synthetic_module("synthetic")
+    root.AUTHORS = "Synthetic"
+    root.CHANGE_HISTORY = []
+    root.CONTACT = "Synthetic"
+    root.CONTRIBUTORS = "Synthetic"
+
+    result = [root]
+    for i in range(processes):
+        module = _get_synthetic_module("synthetic_process_{}".format(i))
+        for j in range(10):
+            module.ENUMERATIONS["choice_{}".format(j)] = {
+                'description': "Synthetic enumeration",
+                'is_open': j % 2 == 0,
+                'members': [("Choice {}".format(k), "Synthetic choice") for k in range(8)]
+            }
+        for j in range(sub_processes):
+            module.DETAILS["sub_process_{}".format(j)] = {
+                'description': "Synthetic sub-process",
+                'properties': [_get_synthetic_property(k) for k in range(per_sub_process)]
+            }
+        result.append(module)
+
+    return result
+
+
+def _get_synthetic_module(name):
+    """Returns a synthetic specialization module.
+
+    """
+    result = types.ModuleType(name)
+    result.__file__ = os.path.join("cmip6", "{}.py".format(name))
+    result.DESCRIPTION = "Synthetic {}".format(name)
+    result.DETAILS = OrderedDict()
+    result.ENUMERATIONS = OrderedDict()
+
+    return result
+
+
+def _get_synthetic_property(idx):
+    """Returns a synthetic property definition.
+
+    """
+    name = "property_{}".format(idx)
+    if idx % 4 == 0:
+        return (name, "ENUM:choice_{}".format(idx % 10), "1.N", "Synthetic enum property")
+
+    return (name, ("str", "int", "float")[idx % 3], "0.1", "Synthetic property")
+
+
+def _report(label, root):
+    """Reports footprint of a specialization graph.
+
+    """
+    nodes, size = get_footprint(root)
+    log("{} :: {} properties :: {} nodes :: {} bytes :: {:.1f} bytes/node".format(
+        label, len(root.all_properties), nodes, size, float(size) / nodes))
+
+
+if __name__ == "__main__":
+    args = _ARGS.parse_args()
+    _report(args.typeof, get_specialization(get_modules(args.input_dir, args.typeof)))
+    _report("synthetic", get_specialization(get_synthetic_modules(args.synthetic_properties)))
@@ -1,21 +1,39 @@
 # -*- coding: utf-8 -*-
 
 """
-.. module:: generate_ids_level_1.py
+.. module:: generate_ids.py
    :platform: Unix, Windows
-   :synopsis: Encodes a cmip6 specialization as CSV.
+   :synopsis: Encodes a cmip6 specialization as level 1, 2 & 3 identifier CSV files.
 
 .. moduleauthor:: Mark Conway-Greenslade <momipsl@ipsl.jussieu.fr>
 
 
 """
+import collections
+import csv
+
 from utils import get_label
-from utils_parser import SpecializationParser
+from utils_parser import StreamingSpecializationParser
+
+
+
+# CSV header row.
+_HEADER = ("cmip6-id", "cmip6-label", "cmip6-type")
+
+# Null row separating topics.
+_NULL_ROW = ("", "", "")
+
+# Identifier levels: 1 = topics, 2 = property sets, 3 = properties.
+LEVELS = (1, 2, 3)
+
+# Map of generator output types to identifier levels.
+OUTPUT_TYPES = collections.OrderedDict(("ids-level-{}".format(i), i) for i in LEVELS)
 
 
+class Generator(StreamingSpecializationParser):
+    """Specialization to level 1, 2 & 3 identifiers generator.
 
-class Generator(SpecializationParser):
-    """Specialization to mindmap generator.
+    N.B. an output is generated per identifier level, each being written row by row as rows are produced.
 
     """
     def __init__(self, project, root, short_tables):
@@ -24,35 +42,109 @@ class Generator(SpecializationParser):
         """
         super(Generator, self).__init__(project, root, short_tables)
 
-        self._ids = [("cmip6-id", "cmip6-label", "cmip6-type", "")]
+        self._labels = {}
+        self._last = {}
+        self._writers = {}
+
+
+    def on_root_parse(self, root):
+        """On root parse event handler.
+
+        """
+        for output_type, level in OUTPUT_TYPES.items():
+            self._writers[level] = csv.writer(self.get_output_stream(output_type), lineterminator="\n")
+            self._write_row(level, _HEADER)
+        self.set_id(1, root)
+
+
+    def on_grid_parse(self, grid):
+        """On grid parse event handler.
+
+        """
+        self._on_topic_parse(grid)
+
+
+    def on_grid_parsed(self, grid):
+        """On grid parsed event handler.
+
+        """
+        self._on_topic_parsed(grid)
+
+
+    def on_keyprops_parse(self, key_props):
+        """On key-properties parse event handler.
+
+        """
+        self._on_topic_parse(key_props)
+
+
+    def on_keyprops_parsed(self, key_props):
+        """On key-properties parsed event handler.
+
+        """
+        self._on_topic_parsed(key_props)
 
 
-    def get_output(self):
-        """Returns generated output as a text blob.
+    def on_process_parse(self, process):
+        """On process parse event handler.
 
         """
-        return "\n".join(self._get_output())
+        self._on_topic_parse(process)
 
 
-    def _get_output(self):
-        """Returns formatted identifier collection.
+    def on_process_parsed(self, process):
+        """On process parsed event handler.
 
         """
-        return ["{}, {}, {}".format(i, j, k)
-                for i, j, k, _ in self._ids]
-        return ["{}, {}, {}".format(i, j, k)
-                for i, j, k, _ in sorted(self._ids, key=lambda i: i[-1])]
+        self._on_topic_parsed(process)
 
 
-    def emit_null_row(self, owner):
+    def on_subprocess_parse(self, subprocess):
+        """On sub-process parse event handler.
+
+        """
+        self.set_id(1, subprocess)
+
+
+    def on_property_set_parse(self, prop_set):
+        """On property set parse event handler.
+
+        """
+        self.set_id(2, prop_set)
+
+
+    def on_property_parse(self, prop):
+        """On property parse event handler.
+
+        """
+        self.set_id(3, prop)
+
+
+    def _on_topic_parse(self, topic):
+        """On top-level topic parse event handler.
+
+        """
+        self.emit_null_row(1)
+        self.set_id(1, topic)
+
+
+    def _on_topic_parsed(self, topic):
+        """On top-level topic parsed event handler.
+
+        """
+        self.emit_null_row(2)
+        self.emit_null_row(3)
+
+
+    def emit_null_row(self, level):
         """Emits a null row.
 
         """
-        if len(self._ids[-1][0]):
-            self._ids.append(("", "", "", owner.id))
+        if len(self._last[level]):
+            self._write_row(level, _NULL_ROW)
 
 
-    def set_id(self, owner, identifier=None):
+    def set_id(self, level, owner, identifier=None):
         """Appends an identifier to managed collection.
 
         """
@@ -65,9 +157,28 @@ class Generator(SpecializationParser):
                 print "Invalid identifier: ", type(owner), owner.name, identifier
                 return
 
-        # Derive label.
-        label = " > ".join([get_label(i) for i in identifier.split(".")[1:]])
+        # Write row.
+        self._write_row(level, (identifier, self._get_label(identifier), owner.type_key))
 
-        # Append to managed collection.
-        self._ids.append((identifier, label, owner.type_key, identifier))
 
+    def _write_row(self, level, row):
+        """Writes a CSV row.
+
+        """
+        self._writers[level].writerow(row)
+        self._last[level] = row[0]
+
+
+    def _get_label(self, identifier):
+        """Returns label derived from an identifier, memoizing labels of identifier segments.
+
+        """
+        result = []
+        for name in identifier.split(".")[1:]:
+            try:
+                result.append(self._labels[name])
+            except KeyError:
+                self._labels[name] = get_label(name)
+                result.append(self._labels[name])
+
+        return " > ".join(result)
@@ -10,13 +10,13 @@
 
 """
 import collections
-import json
 import operator
 import os
 
 
 from utils import get_label
 from utils_constants import *
+from utils_json import dumps
 from utils_parser import SpecializationParser
 
 
@@ -41,8 +41,8 @@ class Generator(SpecializationParser):
         """Returns generated output as a text blob.
 
         """
-        data = json.dumps(self._maps[self.root])
-        fpath = '{}/generate_js.template'.format(os.path.dirname(__file__))
+        data = dumps(self._maps[self.root])
+        fpath = os.path.join(os.path.dirname(__file__), 'generate_js.template')
         with open(fpath) as fstream:
             return fstream.read().replace('TOPIC', data)
 
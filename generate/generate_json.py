@@ -9,16 +9,16 @@
 
 
 """
-import collections
-import json
+import StringIO
 
 from utils import get_label
 from utils_constants import *
-from utils_parser import SpecializationParser
+from utils_json import JsonStreamWriter
+from utils_parser import StreamingSpecializationParser
 
 
 
-class Generator(SpecializationParser):
+class Generator(StreamingSpecializationParser):
     """Specialization to JSON generator.
 
     """
@@ -28,191 +28,233 @@ class Generator(SpecializationParser):
         """
         super(Generator, self).__init__(project, root, short_tables)
 
-        self._maps = collections.OrderedDict()
-        self.on_root_parse = self._on_topic_parse
-        self.on_grid_parse = self._on_topic_parse
-        self.on_keyprops_parse = self._on_topic_parse
-        self.on_process_parse = self._on_topic_parse
-        self.on_subprocess_parse = self._on_topic_parse
+        self._buffers = {}
+        self._frames = []
+        self._writer = None
+        self._writers = []
 
 
-    def get_output(self):
-        """Returns generated output as a text blob.
+    def on_root_parse(self, root):
+        """On root parse event handler.
 
         """
-        return json.dumps(self._maps[self.root], indent=4)
+        self._writer = JsonStreamWriter(self.get_output_stream())
+        self._begin_topic(root, None)
 
 
-    def _on_topic_parse(self, topic):
-        """On topic parse event handler.
-
-        """
-        self._map_topic(topic)
+    def on_root_parsed(self, root):
+        """On root parsed event handler.
 
-
-    def on_property_set_parse(self, prop_set):
-        """On property set parse event handler.
+        N.B. grid & key-properties are written after processes, if no processes then an empty
+        processes collection is written last.
 
         """
-        obj = collections.OrderedDict()
-        obj['label'] = get_label(prop_set.name)
-        obj['description'] = prop_set.description
-        obj['id'] = prop_set.id
-        obj['properties'] = []
-        obj['propertySets'] = []
+        frame = self._frames.pop()
+        self._close_collection(frame)
+        if TYPE_KEY_GRID in self._buffers:
+            self._writer.write_raw(self._buffers.pop(TYPE_KEY_GRID), 'grid')
+        if TYPE_KEY_KEYPROPS in self._buffers:
+            self._writer.write_raw(self._buffers.pop(TYPE_KEY_KEYPROPS), 'keyProperties')
+        if frame['processes'] == 0:
+            self._writer.begin_array('processes')
+            self._writer.end_array()
+        self._writer.end_object()
 
-        self._maps[prop_set] = obj
 
-
-    def on_property_parse(self, prop):
-        """On property parse event handler.
+    def on_grid_parse(self, grid):
+        """On grid parse event handler.
 
         """
-        obj = collections.OrderedDict()
-        obj['label'] = get_label(prop.name)
-        obj['description'] = prop.description
-        obj['id'] = prop.id
-        obj['cardinality'] = prop.cardinality
-        obj['type'] = "enum" if prop.enum else prop.typeof
-        obj['is_cim_property'] = prop.was_injected
-
-        self._maps[prop] = obj
+        self._begin_buffered_topic(grid)
 
 
-    def on_enum_parse(self, enum):
-        """On enum parse event handler.
+    def on_grid_parsed(self, grid):
+        """On grid parsed event handler.
 
         """
-        obj = collections.OrderedDict()
-        obj['label'] = get_label(enum.name)
-        obj['description'] = enum.description
-        obj['isOpen'] = enum.is_open
-        obj['choices'] = []
-
-        self._maps[enum] = obj
+        self._end_buffered_topic(grid)
 
 
-    def on_enum_choice_parse(self, choice):
-        """On process detail property enum choice parse event handler.
+    def on_keyprops_parse(self, key_props):
+        """On key-properties parse event handler.
 
         """
-        obj = collections.OrderedDict()
-        obj['label'] = choice.value
-        obj['description'] = choice.description
+        self._begin_buffered_topic(key_props)
 
-        self._maps[choice] = obj
 
-
-    def on_root_parsed(self, root):
-        """On root parsed event handler.
+    def on_keyprops_parsed(self, key_props):
+        """keyprops parsed event handler.
 
         """
-        obj = self._maps[root]
-        if root[TYPE_KEY_GRID] is not None:
-            obj['grid'] = self._maps[root[TYPE_KEY_GRID]]
-        if root[TYPE_KEY_KEYPROPS] is not None:
-            obj['keyProperties'] = self._maps[root[TYPE_KEY_KEYPROPS]]
-        obj['processes'] = [self._maps[i] for i in root[TYPE_KEY_PROCESS]]
-        self._strip(obj)
+        self._end_buffered_topic(key_props)
 
 
-    def on_grid_parsed(self, grid):
-        """On grid parsed event handler.
+    def on_process_parse(self, process):
+        """On process parse event handler.
 
         """
-        self._strip(self._maps[grid])
+        self._begin_topic(process, 'processes')
 
 
-    def on_keyprops_parsed(self, key_props):
-        """keyprops parsed event handler.
+    def on_process_parsed(self, process):
+        """On process parsed event handler.
 
         """
-        self._strip(self._maps[key_props])
+        self._end_frame()
 
 
-    def on_process_parsed(self, process):
-        """On process parse event handler.
+    def on_subprocess_parse(self, subprocess):
+        """On sub-process parse event handler.
 
         """
-        obj = self._maps[process]
-        self._strip(obj)
-
-        owner = self._maps[self.root]
-        owner['processes'] = owner.get('processes', [])
-        owner['processes'].append(obj)
+        self._begin_topic(subprocess, 'subProcesses')
 
 
     def on_subprocess_parsed(self, subprocess):
         """On sub-process parsed event handler.
 
         """
-        obj = self._maps[subprocess]
-        self._strip(obj)
+        self._end_frame()
 
-        owner = self._maps[subprocess.parent]
-        owner['subProcesses'] = owner.get('subProcesses', [])
-        owner['subProcesses'].append(obj)
+
+    def on_property_set_parse(self, prop_set):
+        """On property set parse event handler.
+
+        """
+        self._begin_frame('propertySets')
+        self._writer.write_value(get_label(prop_set.name), 'label')
+        self._writer.write_value(prop_set.description, 'description')
+        self._writer.write_value(prop_set.id, 'id')
 
 
     def on_property_set_parsed(self, prop_set):
         """On property set parsed event handler.
 
         """
-        obj = self._maps[prop_set]
-        self._strip(obj)
+        self._end_frame()
 
-        owner = self._maps[prop_set.owner]
-        owner['propertySets'] = owner.get('propertySets', [])
-        owner['propertySets'].append(obj)
+
+    def on_property_parse(self, prop):
+        """On property parse event handler.
+
+        """
+        self._open_collection(self._frames[-1], 'properties')
+        self._writer.begin_object()
+        self._writer.write_value(get_label(prop.name), 'label')
+        self._writer.write_value(prop.description, 'description')
+        self._writer.write_value(prop.id, 'id')
+        self._writer.write_value(prop.cardinality, 'cardinality')
+        self._writer.write_value("enum" if prop.enum else prop.typeof, 'type')
+        self._writer.write_value(prop.was_injected, 'is_cim_property')
 
 
     def on_property_parsed(self, prop):
         """On property parsed event handler.
 
         """
-        owner = self._maps[prop.owner]
-        owner['properties'] = owner.get('properties', [])
-        owner['properties'].append(self._maps[prop])
-        self._maps[prop]['uiOrdinal'] = len(owner['properties'])
+        self._writer.write_value(self._frames[-1]['properties'], 'uiOrdinal')
+        self._writer.end_object()
+
+
+    def on_enum_parse(self, enum):
+        """On enum parse event handler.
+
+        """
+        self._writer.begin_object('enum')
+        self._writer.write_value(get_label(enum.name), 'label')
+        self._writer.write_value(enum.description, 'description')
+        self._writer.write_value(enum.is_open, 'isOpen')
+        self._writer.begin_array('choices')
 
 
     def on_enum_parsed(self, enum):
         """On enum parsed event handler.
 
         """
-        detail = self._maps[enum.detail]
-        detail['enum'] = self._maps[enum]
+        self._writer.end_array()
+        self._writer.end_object()
 
 
-    def on_enum_choice_parsed(self, choice):
+    def on_enum_choice_parse(self, choice):
         """On process detail property enum choice parse event handler.
 
         """
-        enum = self._maps[choice.enum]
-        enum['choices'].append(self._maps[choice])
+        self._writer.begin_object()
+        self._writer.write_value(choice.value, 'label')
+        self._writer.write_value(choice.description, 'description')
+        self._writer.end_object()
+
+
+    def _begin_topic(self, topic, collection):
+        """Writes head of a specialization topic.
+
+        """
+        self._begin_frame(collection)
+        self._writer.write_value(get_label(topic.name), 'label')
+        self._writer.write_value(topic.description, 'description')
+        self._writer.write_value(topic.id, 'id')
+        self._writer.write_value(topic.contact, 'contact')
+
+
+    def _begin_buffered_topic(self, topic):
+        """Writes head of a topic that is to be written to root once processes have been written.
+
+        """
+        self._writers.append(self._writer)
+        self._writer = JsonStreamWriter(StringIO.StringIO(), level=1)
+        self._begin_topic(topic, None)
+
+
+    def _end_buffered_topic(self, topic):
+        """Writes tail of a topic that is to be written to root once processes have been written.
+
+        """
+        self._end_frame()
+        self._buffers[topic.type_key] = self._writer.stream.getvalue()
+        self._writer = self._writers.pop()
 
 
-    def _map_topic(self, topic):
-        """Maps a specialization topic to a dictionary.
+    def _begin_frame(self, collection):
+        """Opens an object within a collection of enclosing object.
 
         """
-        obj = collections.OrderedDict()
-        obj['label'] = get_label(topic.name)
-        obj['description'] = topic.description
-        obj['id'] = topic.id
-        obj['contact'] = topic.contact
-        obj['properties'] = []
-        obj['propertySets'] = []
-        self._maps[topic] = obj
+        if collection is not None:
+            self._open_collection(self._frames[-1], collection)
+        self._writer.begin_object()
+        self._frames.append({
+            'collection': None,
+            'processes': 0,
+            'properties': 0,
+            'propertySets': 0,
+            'subProcesses': 0
+        })
 
-        return obj
+
+    def _end_frame(self):
+        """Closes innermost open object.
+
+        """
+        self._close_collection(self._frames.pop())
+        self._writer.end_object()
+
+
+    def _open_collection(self, frame, collection):
+        """Ensures that a collection of an open object is open.
+
+        N.B. collections are opened upon first member so that empty collections are not written.
+
+        """
+        if frame['collection'] != collection:
+            self._close_collection(frame)
+            self._writer.begin_array(collection)
+            frame['collection'] = collection
+        frame[collection] += 1
 
 
-    def _strip(self, obj):
-        """Strips null keys from mapped objects.
+    def _close_collection(self, frame):
+        """Closes an open object's open collection.
 
         """
-        if not obj['properties']:
-            del obj['properties']
-        if not obj['propertySets']:
-            del obj['propertySets']
+        if frame['collection'] is not None:
+            self._writer.end_array()
+            frame['collection'] = None
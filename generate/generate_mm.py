@@ -11,6 +11,7 @@
 """
 import collections
 import json
+import operator
 import os
 
 import xml.etree.ElementTree as ET
@@ -19,23 +20,18 @@ from cim_profile import CIM_PROFILE
 from utils_constants import *
 from utils_model import PropertySpecialization
 from utils_model import TopicSpecialization
-from utils_parser import SpecializationParser
-
-
-# HTML snippet for a set of notes.
-_NOTES_HTML = """
-<html>
-  <head></head>
-  <body>
-    <dl>
-        {}
-    </dl>
-  </body>
-</html>
-"""
+from utils_parser import StreamingSpecializationParser
+from utils_xml import XmlStreamWriter
+
 
-# HTML snippet for a note.
-_NOTE_HTML = "<dt><b>{}</b></dt><dd>{}</dd>"
+# Whitespace of notes html elements - text & tail of html, head, body, dl & final dd elements.
+_NOTES_WHITESPACE = {
+    'html': ("\n  ", None),
+    'head': (None, "\n  "),
+    'body': ("\n    ", "\n"),
+    'dl': ("\n        ", "\n  "),
+    'dd': "\n    "
+}
 
 # Mind-map sections.
 _SECTIONS = collections.OrderedDict()
@@ -48,21 +44,42 @@ _SECTIONS[TYPE_KEY_PROPERTY_SET] = None
 _SECTIONS[TYPE_KEY_REALM] = "science.realm"
 _SECTIONS[TYPE_KEY_SUBPROCESS] = "science.topic"
 
+# Process wide configuration - loaded upon first use.
+_CONFIGURATION = []
+
 
 class _Configuration(object):
     """Wraps access to configuration information stored in associated config file.
 
+    N.B. loaded once per process - see _get_configuration.
+
     """
     def __init__(self):
         """Instance constructor.
 
         """
-        print(__file__)
         fpath = os.path.abspath(__file__).replace(".pyc", ".conf").replace(".py", ".conf")
 
         with open(fpath, 'r') as fstream:
             self._data = json.loads(fstream.read())
 
+        # Precompute per section node attribute & font templates.
+        self._fonts = {}
+        self._nodes = {}
+        for key, cfg in self._data.items():
+            if 'is-collapsed' in cfg:
+                self._nodes[key] = {
+                    'FOLDED': str(cfg['is-collapsed']).lower(),
+                    'COLOR': cfg['font-color'],
+                    'BACKGROUND_COLOR': cfg['bg-color']
+                }
+            if 'font-bold' in cfg:
+                self._fonts[key] = ET.Element('font', {
+                    'BOLD': str(cfg['font-bold']),
+                    'NAME': cfg['font-name'],
+                    'SIZE': str(cfg['font-size'])
+                    })
+
 
     def get_section(self, key):
         """Returns a section within the config file.
@@ -71,7 +88,33 @@ class _Configuration(object):
         return self._data.get(key, {})
 
 
-class Generator(SpecializationParser):
+    def get_node_attributes(self, key):
+        """Returns a copy of a section's node attribute template.
+
+        """
+        return dict(self._nodes[key])
+
+
+    def get_font(self, key):
+        """Returns a section's font element.
+
+        N.B. element is shared between nodes and so must not be mutated.
+
+        """
+        return self._fonts[key]
+
+
+def _get_configuration():
+    """Returns configuration - loaded upon first use.
+
+    """
+    if not _CONFIGURATION:
+        _CONFIGURATION.append(_Configuration())
+
+    return _CONFIGURATION[0]
+
+
+class Generator(StreamingSpecializationParser):
     """Specialization to mindmap generator.
 
     """
@@ -81,57 +124,86 @@ class Generator(SpecializationParser):
         """
         super(Generator, self).__init__(project, root, short_tables)
 
-        self.cfg = _Configuration()
-        self.mmap = None
-        self.nodes = {}
-        self.short_tables_node = None
+        self.cfg = _get_configuration()
+        self._writer = None
 
 
-    def get_output(self):
-        """Returns generated output as a text blob.
+    def on_root_parse(self, root):
+        """On root parse event handler.
 
         """
-        return ET.tostring(self.mmap)
+        self._writer = XmlStreamWriter(self.get_output_stream())
+        self._writer.begin(ET.Element('map', {}))
+        self._writer.begin(self._emit_node(root, style="fork"))
+        self._writer.write(self._emit_change_history(root))
+        self._writer.write(self._emit_legend(root))
+        self._writer.write(self._emit_cim_profile(root))
 
 
-    def on_root_parse(self, root):
-        """On root parse event handler.
+    def on_root_parsed(self, root):
+        """On root parsed event handler.
 
         """
-        self.mmap = ET.Element('map', {})
-        self._emit_node(self.mmap, root, style="fork")
-        self._emit_change_history(root)
-        self._emit_legend(root)
-        self._emit_cim_profile(root)
+        self._writer.end()
+        self._writer.end()
 
 
     def on_grid_parse(self, grid):
         """On grid parse event handler.
 
         """
-        self._emit_node(self.root, grid)
+        self._writer.begin(self._emit_node(grid))
+
+
+    def on_grid_parsed(self, grid):
+        """On grid parsed event handler.
+
+        """
+        self._writer.end()
 
 
     def on_keyprops_parse(self, key_props):
         """On key-properties parse event handler.
 
         """
-        self._emit_node(self.root, key_props)
+        self._writer.begin(self._emit_node(key_props))
+
+
+    def on_keyprops_parsed(self, key_props):
+        """On key-properties parsed event handler.
+
+        """
+        self._writer.end()
 
 
     def on_process_parse(self, process):
         """On process parse event handler.
 
         """
-        self._emit_node(self.root, process)
-        self._emit_notes(process)
+        node = self._emit_node(process)
+        self._emit_notes(node, process)
+        self._writer.begin(node)
+
+
+    def on_process_parsed(self, process):
+        """On process parsed event handler.
+
+        """
+        self._writer.end()
 
 
     def on_subprocess_parse(self, subprocess):
         """On sub-process parse event handler.
 
         """
-        self._emit_node(subprocess.parent, subprocess)
+        self._writer.begin(self._emit_node(subprocess))
+
+
+    def on_subprocess_parsed(self, subprocess):
+        """On sub-process parsed event handler.
+
+        """
+        self._writer.end()
 
 
     def on_property_set_parse(self, prop_set):
@@ -141,42 +213,42 @@ class Generator(SpecializationParser):
         if prop_set.are_cim_properties:
             return
 
-        self._emit_node(prop_set.owner, prop_set)
+        self._writer.begin(self._emit_node(prop_set))
 
 
-    def on_property_parse(self, prop):
-        """On property parse event handler.
+    def on_property_set_parsed(self, prop_set):
+        """On property set parsed event handler.
 
         """
-        if prop.was_injected:
+        if prop_set.are_cim_properties:
             return
 
-        self._emit_node(prop.owner, prop)
-        self._emit_notes(prop)
+        self._writer.end()
 
 
-    def on_enum_choice_parse(self, choice):
-        """On enum property parse event handler.
+    def on_property_parse(self, prop):
+        """On property parse event handler.
 
         """
-        self._emit_node(choice.enum.detail, choice, text=choice.value)
+        if prop.was_injected:
+            return
 
+        node = self._emit_node(prop)
+        self._emit_notes(node, prop)
+        if prop.enum:
+            for choice in prop.enum:
+                node.append(self._emit_node(choice, text=choice.value))
+        self._writer.write(node)
 
-    def _emit_node(self, parent, owner, text=None, style="bubble"):
-        """Sets a mindmap node.
+
+    def _emit_node(self, owner, text=None, style="bubble"):
+        """Returns a mindmap node.
 
         """
-        # Get section style config.
-        cfg = self.cfg.get_section(owner.type_key)
-
-        # Initialise mindmap node attributes.
-        atts = {
-            'FOLDED': str(cfg['is-collapsed']).lower(),
-            'COLOR': cfg['font-color'],
-            'BACKGROUND_COLOR': cfg['bg-color'],
-            'STYLE': style,
-            'TEXT': text if text else owner.name
-        }
+        # Initialise mindmap node attributes from section template.
+        atts = self.cfg.get_node_attributes(owner.type_key)
+        atts['STYLE'] = style
+        atts['TEXT'] = text if text else owner.name
 
         # Set node url.
         try:
@@ -186,63 +258,54 @@ class Generator(SpecializationParser):
         else:
             atts['LINK'] = owner.url
 
-        # Get node parent.
-        if not isinstance(parent, ET.Element):
-            parent = self.nodes[parent]
-
-        # Create new node & cache.
-        self.nodes[owner] = ET.SubElement(parent, 'node', atts)
+        # Create new node.
+        node = ET.Element('node', atts)
 
         # Set node font / notes.
-        self._emit_font(owner, cfg)
-        self._emit_notes(owner)
+        self._emit_font(node, owner.type_key)
+        self._emit_notes(node, owner)
+
+        return node
 
 
-    def _emit_font(self, owner, cfg):
+    def _emit_font(self, node, key):
         """Set node font information.
 
         """
-        ET.SubElement(self.nodes[owner], 'font', {
-            'BOLD': str(cfg['font-bold']),
-            'NAME': cfg['font-name'],
-            'SIZE': str(cfg['font-size'])
-            })
+        node.append(self.cfg.get_font(key))
 
 
-    def _emit_notes(self, owner, notes=None):
+    def _emit_notes(self, parent, owner=None, notes=None):
         """Set mindmap notes.
 
         """
-        # Set parent mm node.
-        parent = owner if isinstance(owner, ET.Element) else \
-                 self.nodes[owner]
-
         # Set notes.
-        notes = notes or _get_notes(owner)
-
-        # Convert to HTML.
-        html = []
-        for k, value in notes:
-            try:
-                owner.id
-            except AttributeError:
-                pass
-            else:
-                value = value(owner)
-            html.append(_NOTE_HTML.format(k, value))
-        html = _NOTES_HTML.format("".join(html))
+        if notes is None:
+            notes = [(k, f(owner)) for k, f in _get_note_schema(owner)]
 
         # Extend mindmap.
         node = ET.SubElement(parent, 'richcontent', {"TYPE": "NOTE"})
-        node.append(ET.fromstring(html))
+        html = _get_element(node, 'html', *_NOTES_WHITESPACE['html'])
+        _get_element(html, 'head', *_NOTES_WHITESPACE['head'])
+        body = _get_element(html, 'body', *_NOTES_WHITESPACE['body'])
+        dl = _get_element(body, 'dl', *_NOTES_WHITESPACE['dl'])
+        dd = None
+        for k, value in notes:
+            dt = ET.SubElement(dl, 'dt')
+            _get_element(dt, 'b', _get_note_text(k))
+            dd = _get_element(dl, 'dd', _get_note_text(value))
+        if dd is None:
+            dl.text += _NOTES_WHITESPACE['dd']
+        else:
+            dd.tail = _NOTES_WHITESPACE['dd']
 
 
     def _emit_legend(self, root):
-        """Emits mindmap legend.
+        """Returns mindmap legend.
 
         """
         cfg = self.cfg.get_section
-        root_node = ET.SubElement(self.nodes[root], 'node', {
+        root_node = ET.Element('node', {
             'FOLDED': "true",
             'STYLE': "bubble",
             'TEXT': "LEGEND",
@@ -259,13 +322,15 @@ class Generator(SpecializationParser):
                 ('Description', cfg(section)['description']),
                 ])
 
+        return root_node
+
 
     def _emit_cim_profile(self, root):
-        """Emits mindmap cim profile.
+        """Returns mindmap cim profile.
 
         """
         cfg = self.cfg.get_section
-        root_node = ET.SubElement(self.nodes[root], 'node', {
+        root_node = ET.Element('node', {
             'FOLDED': "true",
             'STYLE': "bubble",
             'TEXT': "DETAILS INHERITED FROM CIM",
@@ -287,12 +352,14 @@ class Generator(SpecializationParser):
                         'TEXT': name
                         })
 
+        return root_node
+
 
     def _emit_change_history(self, root):
-        """Emits change history.
+        """Returns change history.
 
         """
-        root_node = ET.SubElement(self.nodes[root], 'node', {
+        root_node = ET.Element('node', {
             'FOLDED': "true",
             'STYLE': "bubble",
             'TEXT': "CHANGE HISTORY",
@@ -303,31 +370,40 @@ class Generator(SpecializationParser):
                 'STYLE': "bubble",
                 'TEXT': version
                 })
-            self._emit_notes(node, [
+            self._emit_notes(node, notes=[
                 ("Version", version),
                 ("Date", date),
                 ("Person", person),
                 ("Comment", comment),
             ])
 
+        return root_node
+
 
     def on_short_tables_parse(self, short_tables):
         """On short tables parse event handler.
 
         """
-        self.short_tables_node = ET.SubElement(self.nodes[self.root], 'node', {
+        self._writer.begin(ET.Element('node', {
             'FOLDED': "true",
             'STYLE': "bubble",
             'TEXT': "SHORT TABLES",
             'POSITION': "left"
-            })
+            }))
+
+
+    def on_short_tables_parsed(self, short_tables):
+        """On short tables parsed event handler.
+
+        """
+        self._writer.end()
 
 
     def on_short_table_parse(self, short_table):
         """On short table parse event handler.
 
         """
-        table_node = ET.SubElement(self.short_tables_node, 'node', {
+        table_node = ET.Element('node', {
             'BACKGROUND_COLOR': "#FFFFFF",
             'COLOR': "#000000",
             'STYLE': "bubble",
@@ -351,29 +427,66 @@ class Generator(SpecializationParser):
             self._emit_notes(node, notes=[
                 ('Priority', prop.priority),
                 ])
+        self._writer.write(table_node)
 
 
-def _get_notes(spec):
-    """Returns notes to be appended to a mindmap node.
+def _get_description_note(spec):
+    """Returns description note of a spec object.
 
     """
-    result = [
-        ("Description", lambda i: "N/A" if i.description is None else i.description.replace("&", "and")),
-        ("Spec. ID", lambda i: i.id),
-    ]
+    return "N/A" if spec.description is None else spec.description.replace("&", "and")
 
-    if isinstance(spec, PropertySpecialization):
-        result += [
-            ("Type", lambda i: i.typeof),
-            ("Cardinality", lambda i: i.cardinality),
-            ("Specialization ID", lambda i: i.id)
-        ]
 
+# Note schemas, i.e. note labels & accessors, by spec object type.
+_NOTE_SCHEMA = (
+    ("Description", _get_description_note),
+    ("Spec. ID", operator.attrgetter('id')),
+)
+_NOTE_SCHEMA_PROPERTY = _NOTE_SCHEMA + (
+    ("Type", operator.attrgetter('typeof')),
+    ("Cardinality", operator.attrgetter('cardinality')),
+    ("Specialization ID", operator.attrgetter('id'))
+)
+_NOTE_SCHEMA_REALM = _NOTE_SCHEMA + (
+    ("Contact", operator.attrgetter('contact')),
+    ("Authors", operator.attrgetter('authors')),
+    ("Contributors", operator.attrgetter('contributors'))
+)
+
+
+def _get_note_schema(spec):
+    """Returns schema of notes to be appended to a mindmap node.
+
+    """
+    if isinstance(spec, PropertySpecialization):
+        return _NOTE_SCHEMA_PROPERTY
     elif isinstance(spec, TopicSpecialization) and spec.parent is None:
-        result += [
-            ("Contact", lambda i: i.contact),
-            ("Authors", lambda i: i.authors),
-            ("Contributors", lambda i: i.contributors)
-        ]
+        return _NOTE_SCHEMA_REALM
+
+    return _NOTE_SCHEMA
+
+
+def _get_note_text(value):
+    """Returns text of a note label or value.
+
+    """
+    if not isinstance(value, basestring):
+        value = "{}".format(value)
+    if isinstance(value, str):
+        try:
+            value.decode('ascii')
+        except UnicodeDecodeError:
+            value = value.decode('utf-8')
+
+    return value
+
+
+def _get_element(parent, tag, text=None, tail=None):
+    """Returns a sub-element with text & tail.
+
+    """
+    result = ET.SubElement(parent, tag)
+    result.text = text
+    result.tail = tail
 
     return result
@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+
+"""
+.. module:: generate_sqlite.py
+   :platform: Unix, Windows
+   :synopsis: Encodes a cmip6 specialization as an indexed SQLite database.
+
+.. moduleauthor:: Mark Conway-Greenslade <momipsl@ipsl.jussieu.fr>
+
+
+"""
+import os
+import sqlite3
+import tempfile
+
+from utils_parser import SpecializationParser
+from utils_sqlite import SCHEMA
+
+
+
+class Generator(SpecializationParser):
+    """Specialization to SQLite generator.
+
+    """
+    def __init__(self, project, root, short_tables):
+        """Instance constructor.
+
+        """
+        super(Generator, self).__init__(project, root, short_tables)
+
+        self._enums = {}
+        self._rows = {
+            'enums': [],
+            'enum_choices': [],
+            'properties': [],
+            'property_sets': [],
+            'short_tables': [],
+            'short_table_properties': [],
+            'topics': []
+        }
+        self.on_root_parse = self._on_topic_parse
+        self.on_grid_parse = self._on_topic_parse
+        self.on_keyprops_parse = self._on_topic_parse
+        self.on_process_parse = self._on_topic_parse
+        self.on_subprocess_parse = self._on_topic_parse
+
+
+    def get_output(self):
+        """Returns generated output as a binary blob.
+
+        """
+        fd, fpath = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        try:
+            self._write(fpath)
+            with open(fpath, 'rb') as fstream:
+                return fstream.read()
+        finally:
+            os.remove(fpath)
+
+
+    def _write(self, fpath):
+        """Writes managed rows to a SQLite database.
+
+        """
+        connection = sqlite3.connect(fpath)
+        connection.text_factory = str
+        try:
+            connection.executescript(SCHEMA)
+            for table, rows in sorted(self._rows.items()):
+                if rows:
+                    connection.executemany("INSERT INTO {} VALUES ({})".format(
+                        table, ", ".join(["?"] * len(rows[0]))
+                        ), rows)
+            connection.commit()
+            connection.execute("VACUUM")
+        finally:
+            connection.close()
+
+
+    def _on_topic_parse(self, topic):
+        """On topic parse event handler.
+
+        """
+        self._rows['topics'].append((
+            topic.id.lower(),
+            topic.id,
+            topic.parent.id.lower() if topic.parent else None,
+            topic.name,
+            topic.type_key,
+            topic.description
+            ))
+
+
+    def on_property_set_parse(self, prop_set):
+        """On property set parse event handler.
+
+        """
+        self._rows['property_sets'].append((
+            prop_set.id.lower(),
+            prop_set.id,
+            prop_set.owner.id.lower(),
+            prop_set.name,
+            prop_set.description
+            ))
+
+
+    def on_property_parse(self, prop):
+        """On property parse event handler.
+
+        """
+        self._rows['properties'].append((
+            prop.id.lower(),
+            prop.id,
+            prop.owner.id.lower(),
+            prop.name,
+            prop.typeof,
+            prop.cardinality,
+            prop.description,
+            int(prop.was_injected),
+            self._get_enum_ordinal(prop.enum) if prop.enum else None
+            ))
+
+
+    def on_short_table_parse(self, short_table):
+        """On short table parse event handler.
+
+        """
+        self._rows['short_tables'].append((
+            short_table.name,
+            short_table.label
+            ))
+        for idx, prop in enumerate(short_table):
+            self._rows['short_table_properties'].append((
+                short_table.name,
+                idx,
+                prop.identifier,
+                prop.priority
+                ))
+
+
+    def _get_enum_ordinal(self, enum):
+        """Returns ordinal of an enumeration, emitting its rows upon first encounter.
+
+        """
+        try:
+            return self._enums[enum]
+        except KeyError:
+            pass
+
+        ordinal = self._enums[enum] = len(self._enums)
+        self._rows['enums'].append((
+            ordinal,
+            enum.id,
+            enum.name,
+            enum.description,
+            int(enum.is_open)
+            ))
+        for idx, choice in enumerate(enum):
+            self._rows['enum_choices'].append((
+                ordinal,
+                idx,
+                choice.value,
+                choice.description
+                ))
+
+        return ordinal
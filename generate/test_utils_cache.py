@@ -0,0 +1,178 @@
+"""
+.. module:: test_utils_cache.py
+   :license: GPL/CeCIL
+   :platform: Unix, Windows
+   :synopsis: Exercises specialization cache under concurrent access.
+
+.. moduleauthor:: Mark Conway-Greenslade <momipsl@ipsl.jussieu.fr>
+
+
+"""
+import glob
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+import utils_cache
+
+
+
+# Directory within which realm specialization modules reside.
+_REALM_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Realm specialization type, i.e. name of realm root module.
+_TYPEOF = [i[0:-3] for i in os.listdir(_REALM_DIR) if i.endswith(".py") and "_" not in i][0]
+
+# Number of threads hammering cache.
+_THREADS = 32
+
+
+class ConcurrentCacheTestCase(unittest.TestCase):
+    """Hammers specialization cache lookups from many threads.
+
+    Each test loads realm specialization modules under MIP eras of its own, thereby starting cold.
+
+    """
+    def setUp(self):
+        """Test setup.
+
+        """
+        self.dpath = tempfile.mkdtemp()
+        utils_cache.set_capacity()
+        utils_cache.evict()
+        utils_cache.stats.reset()
+
+
+    def tearDown(self):
+        """Test teardown.
+
+        """
+        utils_cache.set_capacity()
+        utils_cache.evict()
+        utils_cache.stats.reset()
+        utils_cache._ERAS.clear()
+        shutil.rmtree(self.dpath)
+
+
+    def test_lookups_are_single_flight(self):
+        """Concurrent lookups of a cold topic load it once & resolve every property.
+
+        """
+        reference = self._get_property_ids("reference")
+        identifiers = [i.replace("reference.", "hammered.", 1) for i in reference]
+        self._register_era("hammered")
+
+        def _lookup():
+            for identifier in identifiers:
+                prop = utils_cache.get_property_specialization(identifier)
+                assert prop.id == identifier, identifier
+
+        errors = self._hammer(_lookup)
+
+        self.assertEqual(errors, [])
+        self.assertEqual(self._get_loads("hammered"), 1)
+
+
+    def test_topic_lookups_are_single_flight(self):
+        """Concurrent topic lookups return one shared topic.
+
+        """
+        self._register_era("hammered")
+        topics = []
+
+        def _lookup():
+            topics.append(utils_cache.get_topic_specialization("hammered", _TYPEOF))
+
+        errors = self._hammer(_lookup)
+
+        self.assertEqual(errors, [])
+        self.assertEqual(len(topics), _THREADS)
+        self.assertEqual(len(set(id(i) for i in topics)), 1)
+        self.assertEqual(self._get_loads("hammered"), 1)
+
+
+    def test_lookups_across_eras_under_eviction(self):
+        """Concurrent lookups across more eras than the cache holds resolve whilst topics are evicted.
+
+        """
+        reference = self._get_property_ids("reference")
+        eras = ["era{}".format(i) for i in range(12)]
+        for mip_era in eras:
+            self._register_era(mip_era)
+        utils_cache.set_capacity(max_topics=3)
+
+        offsets = iter(range(_THREADS))
+
+        def _lookup():
+            # N.B. each thread starts at a different era so that loads & evictions interleave.
+            offset = next(offsets)
+            for mip_era in eras[offset:] + eras[0:offset]:
+                for identifier in reference[0:5]:
+                    identifier = identifier.replace("reference.", "{}.".format(mip_era), 1)
+                    prop = utils_cache.get_property_specialization(identifier)
+                    assert prop.id == identifier, identifier
+
+        errors = self._hammer(_lookup)
+
+        self.assertEqual(errors, [])
+        self.assertLessEqual(len(utils_cache._LOADED), 3)
+
+
+    def _hammer(self, target):
+        """Invokes a target from many threads released at once, returning errors raised.
+
+        """
+        barrier = threading.Event()
+        errors = []
+
+        def _run():
+            barrier.wait()
+            try:
+                target()
+            except Exception as err:
+                errors.append(err)
+
+        threads = [threading.Thread(target=_run) for _ in range(_THREADS)]
+        for thread in threads:
+            thread.start()
+        barrier.set()
+        for thread in threads:
+            thread.join()
+
+        return errors
+
+
+    def _register_era(self, mip_era):
+        """Registers a MIP era whose specialization modules are copies of realm modules.
+
+        """
+        dpath = os.path.join(self.dpath, mip_era)
+        os.mkdir(dpath)
+        for fpath in glob.glob(os.path.join(_REALM_DIR, "{}*.py".format(_TYPEOF))):
+            shutil.copy(fpath, dpath)
+        utils_cache.register_era(mip_era, dpath)
+
+
+    def _get_property_ids(self, mip_era):
+        """Returns identifiers of all properties of a MIP era's realm.
+
+        """
+        self._register_era(mip_era)
+        topic = utils_cache.get_topic_specialization(mip_era, _TYPEOF)
+
+        return sorted(i.id for i in topic.all_properties)
+
+
+    def _get_loads(self, mip_era):
+        """Returns number of times a MIP era's realm was loaded.
+
+        """
+        key = "{}.{}".format(mip_era, _TYPEOF)
+
+        return utils_cache.get_statistics()['topics'][key]['loads']
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+"""
+.. module:: test_utils_json.py
+   :license: GPL/CeCIL
+   :platform: Unix, Windows
+   :synopsis: Verifies JSON encoding backends yield identical generator output.
+
+.. moduleauthor:: Mark Conway-Greenslade <momipsl@ipsl.jussieu.fr>
+
+
+"""
+import glob
+import os
+import shutil
+import tempfile
+import unittest
+
+import utils_json
+from generate_js import Generator as JavascriptGenerator
+from generate_json import Generator as JSONGenerator
+from utils_factory import get_short_tables
+from utils_factory import get_specialization
+from utils_loader import get_modules
+from utils_loader import get_short_tables_definitions
+from utils_parser import SpecializationParserGroup
+
+
+
+# Directory within which realm specialization modules & committed outputs reside.
+_REALM_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Realm specialization type, i.e. name of realm root module.
+_TYPEOF = [i[0:-3] for i in os.listdir(_REALM_DIR) if i.endswith(".py") and "_" not in i][0]
+
+# MIP era under which realm specializations are hydrated - determines specialization identifiers.
+_MIP_ERA = "cmip6"
+
+# Map of generators to committed output file names.
+_OUTPUTS = (
+    (JSONGenerator, "_{}.json".format(_TYPEOF)),
+    (JavascriptGenerator, "_{}.js".format(_TYPEOF))
+)
+
+
+class BackendOutputTestCase(unittest.TestCase):
+    """Runs json & js generators under each JSON encoding backend & compares against committed output.
+
+    """
+    @classmethod
+    def setUpClass(cls):
+        """Test class setup.
+
+        N.B. realm modules are copied into a MIP era directory as identifiers are derived from directory name.
+
+        """
+        dpath = tempfile.mkdtemp()
+        try:
+            input_dir = os.path.join(dpath, _MIP_ERA)
+            os.mkdir(input_dir)
+            for fpath in glob.glob(os.path.join(_REALM_DIR, "{}*.py".format(_TYPEOF))):
+                shutil.copy(fpath, input_dir)
+            shutil.copytree(os.path.join(_REALM_DIR, "short_tables"), os.path.join(input_dir, "short_tables"))
+
+            cls.root = get_specialization(get_modules(input_dir, _TYPEOF))
+            cls.short_tables = get_short_tables(get_short_tables_definitions(input_dir, _TYPEOF))
+        finally:
+            shutil.rmtree(dpath)
+
+
+    def setUp(self):
+        """Test setup.
+
+        """
+        self.backend = utils_json.get_backend()
+
+
+    def tearDown(self):
+        """Test teardown.
+
+        """
+        utils_json.set_backend(self.backend)
+
+
+    def test_outputs_are_identical_across_backends(self):
+        """Generated json & js are byte for byte identical to committed files under every backend.
+
+        """
+        for backend in sorted(utils_json.BACKENDS):
+            utils_json.set_backend(backend)
+            for generator, output in self._generate().items():
+                with open(os.path.join(_REALM_DIR, generator), 'rb') as fstream:
+                    expected = fstream.read()
+                self.assertTrue(output == expected, "{} differs under {} backend".format(generator, backend))
+
+
+    def _generate(self):
+        """Returns map of committed output file names to generated output.
+
+        """
+        generators = [(i(_MIP_ERA, self.root, self.short_tables), j) for i, j in _OUTPUTS]
+        SpecializationParserGroup(_MIP_ERA, self.root, self.short_tables, [i for i, _ in generators]).run()
+
+        return {j: i.get_output() for i, j in generators}
+
+
+if __name__ == "__main__":
+    unittest.main()
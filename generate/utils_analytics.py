@@ -0,0 +1,167 @@
+"""
+.. module:: utils_analytics.py
+   :license: GPL/CeCIL
+   :platform: Unix, Windows
+   :synopsis: Vectorized statistics over an ensemble of model documents.
+
+.. moduleauthor:: Mark Conway-Greenslade <momipsl@ipsl.jussieu.fr>
+
+
+"""
+import collections
+
+import numpy
+
+from utils_bitset import EnumCodec
+from utils_bitset import OTHER_PREFIX
+
+
+
+class EnsembleStatistics(object):
+    """Loads an ensemble of model documents into columnar arrays keyed by property.
+
+    Documents are scanned once, thereafter statistics are derived by array operations:
+
+    counts  - number of values documented per document & property.
+    invalid - flags of documented enum values that are not enumeration members.
+    masks   - per enum property, bitmask of selected choices per document.
+
+    """
+    def __init__(self, topic, documents):
+        """Instance constructor.
+
+        :param TopicSpecialization topic: Topic whose properties are analysed.
+        :param iterable documents: Model documents, each a map of specialization identifiers to values.
+
+        """
+        self.properties = sorted(topic.all_properties, key=lambda i: i.id)
+        self.codecs = {i.id: EnumCodec(i.enum) for i in self.properties if i.enum}
+        self.counts, self.invalid, self.masks = self._load(documents)
+
+        # Per property flags.
+        self.is_required = numpy.array([i.is_required for i in self.properties], dtype=bool)
+        self.is_collection = numpy.array([i.is_collection for i in self.properties], dtype=bool)
+
+
+    def __len__(self):
+        """Returns number of documents within ensemble.
+
+        """
+        return self.counts.shape[0]
+
+
+    def get_completion_rates(self):
+        """Returns fraction of documents in which each property is documented.
+
+        :returns: Map of property identifiers to completion rate.
+        :rtype: collections.OrderedDict
+
+        """
+        rates = (self.counts > 0).mean(axis=0) if len(self) else numpy.zeros(len(self.properties))
+
+        return self._map(rates)
+
+
+    def get_choice_histograms(self):
+        """Returns frequency of each choice of each enum property.
+
+        :returns: Map of property identifiers to map of choices to number of documents selecting them.
+        :rtype: collections.OrderedDict
+
+        """
+        result = collections.OrderedDict()
+        for prop in self.properties:
+            if prop.id not in self.masks:
+                continue
+            codec = self.codecs[prop.id]
+            histogram = _get_bit_counts(self.masks[prop.id], codec.width)
+            result[prop.id] = collections.OrderedDict(zip(codec.values, histogram))
+            if codec.other_bit:
+                result[prop.id][OTHER_PREFIX] = histogram[-1]
+
+        return result
+
+
+    def get_cardinality_violations(self):
+        """Returns number of documents violating each property's cardinality.
+
+        A violation is either a required property that is undocumented or a single valued property
+        that is documented with more than one value.
+
+        :returns: Map of property identifiers to number of violating documents.
+        :rtype: collections.OrderedDict
+
+        """
+        missing = (self.counts == 0) & self.is_required
+        excess = (self.counts > 1) & ~self.is_collection
+
+        return self._map((missing | excess).sum(axis=0))
+
+
+    def get_invalid_choice_counts(self):
+        """Returns number of documents selecting values that are not members of a property's enumeration.
+
+        :returns: Map of property identifiers to number of offending documents.
+        :rtype: collections.OrderedDict
+
+        """
+        return self._map(self.invalid.sum(axis=0))
+
+
+    def _load(self, documents):
+        """Scans documents into columnar arrays.
+
+        """
+        index = {v.id.lower(): k for k, v in enumerate(self.properties)}
+        counts = []
+        invalid = []
+        selections = {i: [] for i in self.codecs}
+        for document in documents:
+            row_counts = [0] * len(self.properties)
+            row_invalid = [False] * len(self.properties)
+            row_selections = {}
+            for identifier, value in document.iteritems():
+                try:
+                    idx = index[identifier.lower()]
+                except KeyError:
+                    continue
+                if value is None:
+                    continue
+                if value.__class__ is not list and value.__class__ is not tuple:
+                    value = (value, )
+                row_counts[idx] = len(value)
+                prop = self.properties[idx]
+                if prop.id in self.codecs:
+                    try:
+                        row_selections[prop.id] = self.codecs[prop.id].encode(value)
+                    except ValueError:
+                        row_invalid[idx] = True
+            counts.append(row_counts)
+            invalid.append(row_invalid)
+            for identifier in selections:
+                selections[identifier].append(row_selections.get(identifier, 0))
+
+        shape = (len(counts), len(self.properties))
+        counts = numpy.array(counts, dtype=numpy.int32).reshape(shape)
+        invalid = numpy.array(invalid, dtype=bool).reshape(shape)
+        masks = {k: numpy.array(v, dtype=object if self.codecs[k].width > 64 else numpy.uint64)
+                 for k, v in selections.items()}
+
+        return counts, invalid, masks
+
+
+    def _map(self, values):
+        """Returns map of property identifiers to a per property array's values.
+
+        """
+        return collections.OrderedDict((p.id, v.item()) for p, v in zip(self.properties, values))
+
+
+def _get_bit_counts(masks, width):
+    """Returns number of masks in which each bit is set.
+
+    """
+    if masks.dtype == object:
+        return [sum(1 for i in masks if i >> bit & 1) for bit in range(width)]
+
+    return [int(((masks >> numpy.uint64(bit)) & numpy.uint64(1)).sum()) for bit in range(width)]
@@ -0,0 +1,228 @@
+"""
+.. module:: utils_bitset.py
+   :license: GPL/CeCIL
+   :platform: Unix, Windows
+   :synopsis: Bitset encoding of multi-valued enumeration selections.
+
+.. moduleauthor:: Mark Conway-Greenslade <momipsl@ipsl.jussieu.fr>
+
+
+"""
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+
+# Prefix of members added to an open enumeration.
+OTHER_PREFIX = "Other: "
+
+# Number of bits within a vectorized mask.
+_VECTOR_WIDTH = 64
+
+# Lookup table of set bit counts by octet - created upon first use.
+_OCTET_COUNTS = []
+
+
+class EnumCodec(object):
+    """Maps an enumeration's choices to bit positions so that selections can be encoded as bitmasks.
+
+    N.B. the members of an open enumeration that are not choices are encoded by a single
+    trailing 'other' bit, i.e. their text is not retained.
+
+    """
+    def __init__(self, enum):
+        """Instance constructor.
+
+        :param EnumSpecialization enum: Enumeration whose choices are encoded.
+
+        """
+        self.enum = enum
+        self.values = [i.value for i in enum]
+        self.bits = {v: 1 << k for k, v in enumerate(self.values)}
+        self.other_bit = 1 << len(self.values) if enum.is_open else 0
+        self.width = len(self.values) + (1 if enum.is_open else 0)
+
+
+    def __repr__(self):
+        """Instance representation.
+
+        """
+        return "EnumCodec({}, width={})".format(self.enum.id, self.width)
+
+
+    @property
+    def is_vectorized(self):
+        """Gets flag indicating whether masks over many selections are encoded as numpy arrays.
+
+        """
+        return numpy is not None and self.width <= _VECTOR_WIDTH
+
+
+    def encode(self, values):
+        """Returns bitmask of a selection.
+
+        :param list values: Selected enumeration members (a single member or None are also accepted).
+
+        :raises ValueError: If a value is not an enumeration member.
+
+        :rtype: int
+
+        """
+        if values is None:
+            return 0
+        if not isinstance(values, (list, tuple, set, frozenset)):
+            values = (values, )
+
+        result = 0
+        for val in values:
+            try:
+                result |= self.bits[val]
+                continue
+            except (KeyError, TypeError):
+                pass
+            if not self.other_bit or not isinstance(val, basestring) or not val.startswith(OTHER_PREFIX):
+                raise ValueError("Invalid value: is not an enumeration member")
+            result |= self.other_bit
+
+        return result
+
+
+    def decode(self, mask):
+        """Returns selection encoded by a bitmask.
+
+        :param int mask: Bitmask of a selection.
+
+        :returns: Selected choices in enumeration order, followed by OTHER_PREFIX if any other member was selected.
+        :rtype: list
+
+        """
+        mask = int(mask)
+        result = [v for v in self.values if mask & self.bits[v]]
+        if mask & self.other_bit:
+            result.append(OTHER_PREFIX)
+
+        return result
+
+
+    def get_mask(self, values):
+        """Returns query mask of a set of choices - alias of encode.
+
+        :param list values: Enumeration choices.
+
+        :rtype: int
+
+        """
+        return self.encode(values)
+
+
+    def encode_all(self, selections):
+        """Returns bitmasks of many selections.
+
+        :param iterable selections: Selections, each a list of enumeration members.
+
+        :returns: Bitmasks as a uint64 numpy array if vectorized, otherwise as a list of ints.
+        :rtype: numpy.ndarray | list
+
+        """
+        result = [self.encode(i) for i in selections]
+        if self.is_vectorized:
+            result = numpy.array(result, dtype=numpy.uint64)
+
+        return result
+
+
+    def encode_documents(self, documents, specialization_id):
+        """Returns bitmasks of a property's selections across many model documents.
+
+        :param iterable documents: Model documents, each a map of specialization identifiers to values.
+        :param str specialization_id: Identifier of property whose selections are encoded.
+
+        :returns: Bitmasks as a uint64 numpy array if vectorized, otherwise as a list of ints.
+        :rtype: numpy.ndarray | list
+
+        """
+        return self.encode_all(i.get(specialization_id) for i in documents)
+
+
+def contains(masks, query):
+    """Returns flags indicating which selections contain all of a query's choices.
+
+    :param numpy.ndarray|list masks: Selection bitmasks.
+    :param int query: Query bitmask.
+
+    :returns: Flag per selection.
+    :rtype: numpy.ndarray | list
+
+    """
+    if _is_vector(masks):
+        query = numpy.uint64(query)
+        return (masks & query) == query
+
+    return [i & query == query for i in masks]
+
+
+def intersects(masks, query):
+    """Returns flags indicating which selections contain any of a query's choices.
+
+    :param numpy.ndarray|list masks: Selection bitmasks.
+    :param int query: Query bitmask.
+
+    :returns: Flag per selection.
+    :rtype: numpy.ndarray | list
+
+    """
+    if _is_vector(masks):
+        return (masks & numpy.uint64(query)) != 0
+
+    return [i & query != 0 for i in masks]
+
+
+def intersection(masks, query):
+    """Returns selections restricted to a query's choices.
+
+    :param numpy.ndarray|list masks: Selection bitmasks.
+    :param int query: Query bitmask.
+
+    :returns: Bitmask per selection.
+    :rtype: numpy.ndarray | list
+
+    """
+    if _is_vector(masks):
+        return masks & numpy.uint64(query)
+
+    return [i & query for i in masks]
+
+
+def popcount(masks):
+    """Returns number of choices within each selection.
+
+    :param numpy.ndarray|list masks: Selection bitmasks.
+
+    :returns: Count per selection.
+    :rtype: numpy.ndarray | list
+
+    """
+    if _is_vector(masks):
+        octets = masks.astype(numpy.uint64).view(numpy.uint8).reshape(-1, 8)
+        return _get_octet_counts()[octets].sum(axis=1)
+
+    return [bin(i).count("1") for i in masks]
+
+
+def _is_vector(masks):
+    """Returns flag indicating whether masks are a numpy array.
+
+    """
+    return numpy is not None and isinstance(masks, numpy.ndarray)
+
+
+def _get_octet_counts():
+    """Returns lookup table of set bit counts by octet.
+
+    """
+    if not _OCTET_COUNTS:
+        _OCTET_COUNTS.append(numpy.array([bin(i).count("1") for i in range(256)], dtype=numpy.uint8))
+
+    return _OCTET_COUNTS[0]
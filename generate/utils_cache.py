@@ -8,21 +8,161 @@
 
 
 """
+import errno
+import itertools
 import os
+import threading
+import time
 
+import utils_cache_stats as stats
 from utils_loader import get_modules
+from utils_trie import SpecializationTrie
 
 
 
-# Map of specializations by id.
+# Map of topic keys to map of specializations by id.
 _CACHE = dict()
 
+# Set of keys of topics whose specializations have been fully loaded.
+_LOADED = set()
+
+# Map of topic keys to locks that serialise loading of each topic.
+_LOCKS = dict()
+
+# Lock guarding creation of topic locks.
+_LOCKS_GUARD = threading.Lock()
+
+# Map of topic keys to tick of last access - drives LRU eviction.
+_TICKS = dict()
+
+# Monotonic access clock.
+_CLOCK = itertools.count()
+
+# Lock serialising eviction.
+_EVICTION_LOCK = threading.Lock()
+
+# Cache budget - None signifies unbounded.
+_CAPACITY = {
+	'max_entries': None,
+	'max_topics': None
+}
+
+# Map of MIP eras to directories within which era specializations reside.
+_ERAS = dict()
+
+# Map of topic keys to SQLite specialization indexes.
+_INDEXES = dict()
+
+# Map of topic keys to prefix tries over topic specialization identifiers - built lazily.
+_TRIES = dict()
+
 
 def set_specialization(spec):
     """Place specialization in cache.
 
     """
-    _CACHE[spec.id.lower()] = spec
+    key = _get_topic_cache_key(*spec.id.split('.')[0:2])
+    _CACHE.setdefault(key, {})[spec.id.lower()] = spec
+    _TRIES.pop(key, None)
+
+
+def set_topic_specialization(topic):
+	"""Places a hydrated topic's specializations in cache, marking topic as loaded.
+
+	:param TopicSpecialization topic: A hydrated specialization root, e.g. as returned by a snapshot.
+
+	"""
+	key = _get_topic_cache_key(*topic.id.split('.')[0:2])
+	if key in _LOADED and _CACHE.get(key, {}).get(key) is topic:
+		return
+
+	for sub_topic in topic.all_topics:
+		set_specialization(sub_topic)
+		for prop in sub_topic.properties:
+			set_specialization(prop)
+		for prop_set in sub_topic.property_sets:
+			set_specialization(prop_set)
+			for prop in prop_set.properties:
+				set_specialization(prop)
+	preload(*topic.id.split('.')[0:2])
+
+
+def set_capacity(max_topics=None, max_entries=None):
+	"""Sets cache budget, evicting least recently used topics if exceeded.
+
+	:param int max_topics: Maximum number of loaded topics (None = unbounded).
+	:param int max_entries: Maximum number of cached specializations (None = unbounded).
+
+	"""
+	_CAPACITY['max_topics'] = max_topics
+	_CAPACITY['max_entries'] = max_entries
+	_enforce_capacity()
+
+
+def register_era(mip_era, dpath):
+	"""Registers directory within which a MIP era's specializations reside.
+
+	:param str mip_era: MIP era, e.g. cmip6.
+	:param str dpath: Directory within which era specialization modules reside.
+
+	"""
+	_ERAS[mip_era.strip().lower()] = dpath
+
+
+def register_index(mip_era, topic, fpath):
+	"""Registers a SQLite index from which a topic's property lookups are answered.
+
+	N.B. Whilst a topic has not been loaded its property lookups are answered by the index,
+	thereby avoiding execution of specialization modules.
+
+	:param str mip_era: MIP era that model documentation is related to.
+	:param str topic: Specialization topic.
+	:param str fpath: Path to SQLite index generated by generate_sqlite.
+
+	"""
+	# JIT to avoid circular dependencies.
+	from utils_sqlite import SpecializationIndex
+
+	_INDEXES[_get_topic_cache_key(mip_era, topic)] = SpecializationIndex(fpath)
+
+
+def preload(mip_era, topic):
+	"""Loads topic specializations into cache ahead of use.
+
+	:param str mip_era: MIP era that model documentation is related to.
+	:param str topic: Specialization topic.
+
+	"""
+	_get_topic_cache(mip_era, topic, 'preload')
+
+
+def get_statistics():
+	"""Returns a snapshot of cache hit / miss counters & load latencies.
+
+	:returns: Cache statistics by topic key plus totals.
+	:rtype: dict
+
+	"""
+	return stats.get_snapshot()
+
+
+def evict(mip_era=None, topic=None):
+	"""Evicts loaded topic specializations from cache.
+
+	:param str mip_era: MIP era to be evicted (None = all eras).
+	:param str topic: Specialization topic to be evicted (None = all era topics).
+
+	"""
+	if mip_era is not None and topic is not None:
+		keys = [_get_topic_cache_key(mip_era, topic)]
+	else:
+		keys = list(_CACHE)
+		if mip_era is not None:
+			keys = [i for i in keys if i.split('.')[0] == mip_era.strip().lower()]
+
+	with _EVICTION_LOCK:
+		for key in keys:
+			_evict(key)
 
 
 def get_topic_specialization(mip_era, topic):
@@ -35,10 +175,7 @@ def get_topic_specialization(mip_era, topic):
 	:rtype: TopicSpecialization
 
 	"""
-	# JIT load.
-	_set_topic_specialization(mip_era, topic)
-
-	return _CACHE[_get_topic_cache_key(mip_era, topic)]
+	return _get_topic_cache(mip_era, topic, 'topic')[_get_topic_cache_key(mip_era, topic)]
 
 
 def get_property_specialization(specialization_id):
@@ -53,35 +190,261 @@ def get_property_specialization(specialization_id):
 	if len(specialization_id) == 0:
 		return
 
-	# JIT load.
 	parts = specialization_id.split('.')
-	_set_topic_specialization(parts[0], parts[1])
 
-	return _CACHE[specialization_id.lower()]
+	# Answer from index if topic is not loaded.
+	key = _get_topic_cache_key(parts[0], parts[1])
+	if key in _INDEXES and key not in _LOADED:
+		stats.record_lookup(key, 'property-index', True)
+		return _INDEXES[key].get_specialization(specialization_id)
+
+	return _get_topic_cache(parts[0], parts[1], 'property')[specialization_id.lower()]
+
+
+def get_required_property_ids(mip_era, topic):
+	"""Returns identifiers of properties that must be documented for a topic.
+
+	N.B. Whilst a topic has not been loaded the identifiers are answered by its index (if registered).
+
+	:param str mip_era: MIP era that model documentation is related to.
+	:param str topic: Specialization topic.
+
+	:returns: Lower cased property identifiers.
+	:rtype: frozenset
+
+	"""
+	key = _get_topic_cache_key(mip_era, topic)
+	if key in _INDEXES and key not in _LOADED:
+		stats.record_lookup(key, 'required-index', True)
+		return frozenset(i.lower() for i in _INDEXES[key].get_required_property_ids(key + '.'))
+
+	topic = _get_topic_cache(mip_era, topic, 'required')[key]
+
+	return frozenset(i.id.lower() for i in topic.all_required_properties)
+
+
+def get_specializations(prefix):
+	"""Returns specializations within a subtree of specialization identifiers.
+
+	:param str prefix: Identifier of subtree root, e.g. cmip6.ocnbgchem.key_properties.gas_exchange.
+
+	:returns: Subtree specializations, including subtree root, in identifier order.
+	:rtype: list
+
+	"""
+	return _get_topic_trie(prefix).get_subtree(prefix)
+
+
+def get_descendant_count(prefix):
+	"""Returns number of specializations beneath a subtree root.
+
+	:param str prefix: Identifier of subtree root, e.g. cmip6.ocnbgchem.key_properties.gas_exchange.
+
+	:rtype: int
+
+	"""
+	return _get_topic_trie(prefix).get_count(prefix)
+
+
+def resolve_specialization_id(partial):
+	"""Returns specialization identifiers that a partial identifier resolves to.
+
+	:param str partial: Partial identifier, e.g. cmip6.ocnbgchem.key_properties.gas.
+
+	:returns: Matching identifiers in identifier order.
+	:rtype: list
+
+	"""
+	return _get_topic_trie(partial).resolve(partial)
+
+
+def _get_topic_trie(specialization_id):
+	"""Returns prefix trie over the specializations of the topic to which an identifier belongs.
+
+	"""
+	parts = specialization_id.split('.')
+	if len(parts) < 2:
+		raise ValueError("Identifier must be scoped by MIP era & topic: {}".format(specialization_id))
+
+	key = _get_topic_cache_key(parts[0], parts[1])
+	cache = _get_topic_cache(parts[0], parts[1], 'trie')
+	try:
+		return _TRIES[key]
+	except KeyError:
+		pass
+
+	# N.B. trie is only retained if topic was not concurrently evicted whilst being built.
+	trie = SpecializationTrie(cache.values())
+	with _get_topic_lock(key):
+		if _CACHE.get(key) is cache:
+			_TRIES[key] = trie
+
+	return trie
+
+
+def _get_topic_cache(mip_era, topic, kind):
+	"""Returns map of a topic's specializations by id, loading them if necessary.
+
+	"""
+	key = _get_topic_cache_key(mip_era, topic)
+	is_hit = key in _LOADED
+	while True:
+		# JIT load.
+		loaded = _set_topic_specialization(mip_era, topic)
+		if loaded:
+			_enforce_capacity(key)
+
+		# N.B. topic may be concurrently evicted (and partially reloaded) - in which case reload.
+		try:
+			result = _CACHE[key]
+		except KeyError:
+			continue
+		if key not in _LOADED:
+			continue
+		_TICKS[key] = next(_CLOCK)
+
+		# N.B. recorded once resolved so that topics failing to load leave no statistics.
+		stats.record_lookup(key, kind, is_hit)
+
+		return result
 
 
 def _set_topic_specialization(mip_era, topic):
 	"""Loads topic specializations into memory.
 
+	N.B. Loading is single-flight: concurrent callers requesting the same topic wait
+	upon the one caller performing the load, and once loaded no lock is taken.  If loading
+	fails the topic lock is discarded so that unknown topics do not accumulate locks.
+
+	:returns: Flag indicating whether topic was loaded by this call.
+	:rtype: bool
+
 	"""
-	if _get_topic_cache_key(mip_era, topic) in _CACHE:
-		return
+	key = _get_topic_cache_key(mip_era, topic)
+	if key in _LOADED:
+		return False
+
+	with _get_topic_lock(key):
+		if key in _LOADED:
+			return False
+
+		# N.B. topic may have been hydrated outside of cache, e.g. by generators.
+		if key not in _CACHE or key not in _CACHE[key]:
+			try:
+				_load_topic_specialization(key, mip_era, topic)
+			except Exception:
+				with _LOCKS_GUARD:
+					_LOCKS.pop(key, None)
+				raise
+
+		_TICKS[key] = next(_CLOCK)
+		_LOADED.add(key)
+
+		return True
 
+
+def _load_topic_specialization(key, mip_era, topic):
+	"""Executes a topic's specialization modules, thereby placing its specializations in cache.
+
+	"""
 	# JIT to avoid circular dependencies.
 	from utils_factory import create_specializations
 
 	mip_era = mip_era.strip().lower()
 	topic = topic.strip().lower()
-	dpath = os.path.join(os.path.dirname(__file__), mip_era)
-	modules = get_modules(dpath, topic)
+	if not _has_topic_source(mip_era, topic):
+		raise KeyError("Specializations not found: {}".format(key))
+
+	started = time.time()
+	modules = get_modules(_get_era_directory(mip_era), topic)
 	create_specializations(modules)
+	if key not in _CACHE or key not in _CACHE[key]:
+		raise KeyError("Specializations not found: {}".format(key))
+	stats.record_load(key, time.time() - started)
+
+
+def _has_topic_source(mip_era, topic):
+	"""Returns flag indicating whether a topic's root specialization module exists.
+
+	N.B. an unregistered era without a default directory is unknown, whereas the directory of a
+	registered era must exist, as must some source of specializations - otherwise deployment is misconfigured.
+
+	"""
+	dpath = _get_era_directory(mip_era)
+	if not os.path.isdir(dpath):
+		if mip_era in _ERAS or not (_ERAS or _CACHE or _INDEXES):
+			raise IOError(errno.ENOENT, "MIP era directory not found", dpath)
+		return False
+
+	return os.path.isfile(os.path.join(dpath, topic + ".py"))
+
+
+def _get_era_directory(mip_era):
+	"""Returns directory within which an era's specializations reside.
+
+	"""
+	try:
+		return _ERAS[mip_era]
+	except KeyError:
+		return os.path.join(os.path.dirname(__file__), mip_era)
+
+
+def _get_topic_lock(key):
+	"""Returns lock serialising loading of a topic.
+
+	"""
+	with _LOCKS_GUARD:
+		try:
+			return _LOCKS[key]
+		except KeyError:
+			_LOCKS[key] = threading.Lock()
+			return _LOCKS[key]
+
+
+def _enforce_capacity(retain=None):
+	"""Evicts least recently used topics until cache is within budget.
+
+	"""
+	max_topics = _CAPACITY['max_topics']
+	max_entries = _CAPACITY['max_entries']
+	if max_topics is None and max_entries is None:
+		return
+
+	with _EVICTION_LOCK:
+		while True:
+			# N.B. iterates a snapshot as topics are concurrently loaded without taking eviction lock.
+			loaded = list(_LOADED)
+			topics = len(loaded)
+			entries = sum(len(_CACHE.get(i, ())) for i in loaded)
+			if (max_topics is None or topics <= max_topics) and \
+			   (max_entries is None or entries <= max_entries):
+				return
+			candidates = [i for i in loaded if i != retain]
+			if not candidates:
+				return
+			_evict(min(candidates, key=lambda i: _TICKS.get(i, -1)))
+
+
+def _evict(key):
+	"""Evicts a topic's specializations from cache.
+
+	"""
+	with _get_topic_lock(key):
+		if key in _LOADED:
+			stats.record_eviction(key)
+		_LOADED.discard(key)
+		_CACHE.pop(key, None)
+		_TICKS.pop(key, None)
+		_TRIES.pop(key, None)
 
 
 def _get_topic_cache_key(mip_era, topic):
 	"""Returns topic specialization cache key.
 
+	N.B. joined rather than formatted so that non-ascii unicode identifiers do not raise UnicodeEncodeError.
+
 	"""
 	mip_era = mip_era.strip().lower()
 	topic = topic.strip().lower()
 
-	return "{}.{}".format(mip_era, topic)
+	return ".".join((mip_era, topic))
@@ -0,0 +1,243 @@
+"""
+.. module:: utils_cache_stats.py
+   :license: GPL/CeCIL
+   :platform: Unix, Windows
+   :synopsis: Specialization cache instrumentation.
+
+.. moduleauthor:: Mark Conway-Greenslade <momipsl@ipsl.jussieu.fr>
+
+
+"""
+import collections
+import json
+import threading
+import time
+
+from utils import log
+
+
+
+# Upper bounds (seconds) of load latency histogram buckets.
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, float('inf'))
+
+# Per thread lookup counters - avoids contention upon cache hit path.
+_LOCAL = threading.local()
+
+# Per thread lookup counters of live threads, each a 2 member tuple: thread, counters.
+_COUNTERS = []
+
+# Lookup counters folded in from threads that have exited.
+_RETIRED = collections.defaultdict(int)
+
+# Map of topic keys to load / eviction measures.
+_LOADS = dict()
+
+# Lock guarding counter registration & load / eviction measures.
+_LOCK = threading.Lock()
+
+
+def record_lookup(topic_key, kind, is_hit):
+    """Records a cache lookup.
+
+    :param str topic_key: Cache key of topic being looked up.
+    :param str kind: Kind of lookup, i.e. topic | property.
+    :param bool is_hit: Flag indicating whether lookup was served without loading.
+
+    """
+    try:
+        counters = _LOCAL.counters
+    except AttributeError:
+        counters = _LOCAL.counters = collections.defaultdict(int)
+        with _LOCK:
+            _retire_counters()
+            _COUNTERS.append((threading.current_thread(), counters))
+    counters[(topic_key, kind, is_hit)] += 1
+
+
+def record_load(topic_key, elapsed):
+    """Records a JIT topic load.
+
+    :param str topic_key: Cache key of topic loaded.
+    :param float elapsed: Load duration in seconds.
+
+    """
+    with _LOCK:
+        measures = _get_measures(topic_key)
+        measures['loads'] += 1
+        measures['latencyTotal'] += elapsed
+        measures['latencyMax'] = max(measures['latencyMax'], elapsed)
+        for idx, bound in enumerate(LATENCY_BUCKETS):
+            if elapsed <= bound:
+                measures['latencyHistogram'][idx] += 1
+                break
+
+
+def record_eviction(topic_key):
+    """Records eviction of a topic from cache.
+
+    :param str topic_key: Cache key of topic evicted.
+
+    """
+    with _LOCK:
+        _get_measures(topic_key)['evictions'] += 1
+
+
+def get_snapshot():
+    """Returns a point in time snapshot of cache statistics.
+
+    :returns: Cache statistics by topic key plus totals.
+    :rtype: dict
+
+    """
+    with _LOCK:
+        _retire_counters()
+        counters = [dict(_RETIRED)] + [dict(i) for _, i in _COUNTERS]
+        loads = {k: dict(v, latencyHistogram=list(v['latencyHistogram'])) for k, v in _LOADS.items()}
+
+    topics = collections.defaultdict(_get_topic_snapshot)
+    for (topic_key, kind, is_hit), count in [i for c in counters for i in c.items()]:
+        topics[topic_key]['hits' if is_hit else 'misses'][kind] += count
+    for topic_key, measures in loads.items():
+        topic = topics[topic_key]
+        topic['loads'] = measures['loads']
+        topic['evictions'] = measures['evictions']
+        topic['loadLatency'] = {
+            'count': measures['loads'],
+            'max': measures['latencyMax'],
+            'mean': measures['latencyTotal'] / measures['loads'] if measures['loads'] else 0.0,
+            'total': measures['latencyTotal'],
+            'histogram': {str(i): j for i, j in zip(LATENCY_BUCKETS, measures['latencyHistogram'])}
+        }
+
+    totals = _get_topic_snapshot()
+    for topic in topics.values():
+        for measure in ('hits', 'misses'):
+            for kind, count in topic[measure].items():
+                totals[measure][kind] += count
+        totals['loads'] += topic['loads']
+        totals['evictions'] += topic['evictions']
+    del totals['loadLatency']
+
+    return {
+        'timestamp': time.time(),
+        'topics': {k: _to_plain(v) for k, v in topics.items()},
+        'totals': _to_plain(totals)
+    }
+
+
+def dumps():
+    """Returns a snapshot of cache statistics encoded as JSON.
+
+    """
+    return json.dumps(get_snapshot(), indent=4, sort_keys=True)
+
+
+def log_snapshot():
+    """Logs a summary of cache statistics.
+
+    """
+    snapshot = get_snapshot()
+    for topic_key, topic in sorted(snapshot['topics'].items()):
+        log("cache :: {} :: hits={} misses={} loads={} evictions={} mean-load={:.3f}s".format(
+            topic_key,
+            sum(topic['hits'].values()),
+            sum(topic['misses'].values()),
+            topic['loads'],
+            topic['evictions'],
+            topic['loadLatency']['mean']
+            ))
+
+
+def start_logging(interval):
+    """Starts logging cache statistics periodically from a background thread.
+
+    :param float interval: Logging interval in seconds.
+
+    :returns: Event which when set stops logging.
+    :rtype: threading.Event
+
+    """
+    stop = threading.Event()
+
+    def _log():
+        while not stop.wait(interval):
+            log_snapshot()
+
+    thread = threading.Thread(target=_log, name="cache-stats-logger")
+    thread.daemon = True
+    thread.start()
+
+    return stop
+
+
+def reset():
+    """Resets cache statistics.
+
+    """
+    with _LOCK:
+        for _, counters in _COUNTERS:
+            counters.clear()
+        _RETIRED.clear()
+        _LOADS.clear()
+
+
+def _retire_counters():
+    """Folds lookup counters of exited threads into retired counters, thereby bounding number of counters held.
+
+    N.B. caller must hold _LOCK.
+
+    """
+    live = []
+    for thread, counters in _COUNTERS:
+        if thread.is_alive():
+            live.append((thread, counters))
+        else:
+            for key, count in counters.items():
+                _RETIRED[key] += count
+    _COUNTERS[:] = live
+
+
+def _get_measures(topic_key):
+    """Returns load / eviction measures of a topic.
+
+    """
+    try:
+        return _LOADS[topic_key]
+    except KeyError:
+        _LOADS[topic_key] = {
+            'evictions': 0,
+            'latencyHistogram': [0] * len(LATENCY_BUCKETS),
+            'latencyMax': 0.0,
+            'latencyTotal': 0.0,
+            'loads': 0
+        }
+        return _LOADS[topic_key]
+
+
+def _get_topic_snapshot():
+    """Returns an empty topic statistics snapshot.
+
+    """
+    return {
+        'evictions': 0,
+        'hits': collections.defaultdict(int),
+        'loadLatency': {
+            'count': 0,
+            'histogram': {str(i): 0 for i in LATENCY_BUCKETS},
+            'max': 0.0,
+            'mean': 0.0,
+            'total': 0.0
+        },
+        'loads': 0,
+        'misses': collections.defaultdict(int)
+    }
+
+
+def _to_plain(topic):
+    """Converts a topic statistics snapshot to plain (JSON encodable) types.
+
+    """
+    topic['hits'] = dict(topic['hits'])
+    topic['misses'] = dict(topic['misses'])
+
+    return topic
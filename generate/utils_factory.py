@@ -18,6 +18,7 @@ from utils_model import PropertySpecialization
 from utils_model import ShortTable
 from utils_model import ShortTableProperty
 from utils_model import TopicSpecialization
+from utils_numbering import number_specialization
 
 
 
@@ -30,12 +31,18 @@ def get_specialization(modules):
     :rtype: TopicSpecialization
 
     """
+    # Map of enumeration wrappers keyed by (module enumerations, enumeration key) - scoped to this build.
+    enums = dict()
+
     # Create root topic.
-    root = _create_topic(modules[0], None)
+    root = _create_topic(modules[0], None, enums)
 
     # Create sub-topics.
     for module in modules[1:]:
-        _create_topic(module, root)
+        _create_topic(module, root, enums)
+
+    # Assign dense integer ids.
+    root.numbering = number_specialization(root)
 
     return root
 
@@ -43,7 +50,7 @@ def get_specialization(modules):
 create_specializations = get_specialization
 
 
-def _create_topic(spec, parent, key=None):
+def _create_topic(spec, parent, enums, key=None):
     """Creates & returns a topic specialization.
 
     """
@@ -51,14 +58,14 @@ def _create_topic(spec, parent, key=None):
         return None
 
     # Hydrate either from a dictionary or a module.
-    topic = TopicSpecialization(spec, parent)
+    topic = TopicSpecialization(spec, parent, key)
     if isinstance(spec, dict):
         _set_topic_from_dict(topic, parent, key)
     else:
-        _set_topic_from_module(topic, parent)
+        _set_topic_from_module(topic, parent, enums)
 
     # Set injected properties.
-    _set_topic_injected_properties(topic)
+    _set_topic_injected_properties(topic, enums)
 
     # Cache.
     cache_specialization(topic)
@@ -66,7 +73,7 @@ def _create_topic(spec, parent, key=None):
     return topic
 
 
-def _set_topic_injected_properties(topic):
+def _set_topic_injected_properties(topic, enums):
     """Injects a set of properties into the set of specializations.
 
     """
@@ -74,70 +81,70 @@ def _set_topic_injected_properties(topic):
     if len(topic.path) == 3 and topic.path[1] == 'toplevel' and topic.path[2] == 'key_properties':
         if not topic.has_property('overview'):
             description = 'Top level overview of coupled model'
-            _set_injected_property('overview', 'l-str', '1.1', description, topic)
+            _set_injected_property('overview', 'l-str', '1.1', description, topic, enums)
 
         if not topic.has_property('keywords'):
             description = 'Keywords associated with coupled model'
-            _set_injected_property('keywords', 'cs-str', '1.1', description, topic)
+            _set_injected_property('keywords', 'cs-str', '1.1', description, topic, enums)
 
         if not topic.has_property('name'):
             description = 'Name of coupled model'
-            _set_injected_property('name', 'str', '1.1', description, topic)
+            _set_injected_property('name', 'str', '1.1', description, topic, enums)
 
     # Topic key properties.
     elif len(topic.path) == 3 and topic.path[2] == 'key_properties':
         if not topic.has_property('overview'):
             description = 'Overview of {} model.'.format(topic.root.name)
-            _set_injected_property('overview', 'l-str', '1.1', description, topic)
+            _set_injected_property('overview', 'l-str', '1.1', description, topic, enums)
 
         if not topic.has_property('keywords'):
             description = 'Keywords associated with {} model code'.format(topic.root.name)
-            _set_injected_property('keywords', 'cs-str', '1.1', description, topic)
+            _set_injected_property('keywords', 'cs-str', '1.1', description, topic, enums)
 
         if not topic.has_property('name'):
             description = 'Name of {} model code'.format(topic.root.name)
-            _set_injected_property('name', 'str', '1.1', description, topic)
+            _set_injected_property('name', 'str', '1.1', description, topic, enums)
 
     # Topic grid properties.
     elif len(topic.path) == 3 and topic.path[-1] == 'grid':
         if not topic.has_property('overview'):
             description = 'Overview of grid in {} model.'.format(topic.root.name)
-            _set_injected_property('overview', 'l-str', '0.1', description, topic)
+            _set_injected_property('overview', 'l-str', '0.1', description, topic, enums)
 
         if not topic.has_property('name'):
             description = 'Name of grid in {} model.'.format(topic.root.name)
-            _set_injected_property('name', 'str', '0.1', description, topic)
+            _set_injected_property('name', 'str', '0.1', description, topic, enums)
 
     # Topic process properties.
     elif len(topic.path) == 3:
         if not topic.has_property('overview'):
             description = 'Overview of {} in {} model.'.format(topic.description.lower(), topic.root.name)
-            _set_injected_property('overview', 'l-str', '0.1', description, topic)
+            _set_injected_property('overview', 'l-str', '0.1', description, topic, enums)
 
         if not topic.has_property('name'):
             description = 'Commonly used name for the {} in {} model.'.format(topic.name_camel_case_spaced.lower(), topic.root.name)
-            _set_injected_property('name', 'str', '0.1', description, topic)
+            _set_injected_property('name', 'str', '0.1', description, topic, enums)
 
     # Topic sub-process properties.
     elif len(topic.path) == 4:
         pass
         # if not topic.has_property('overview'):
         #     description = 'Overview of {} in {} model.'.format(topic.description.lower(), topic.root.name)
-        #     _set_injected_property('overview', 'str', '0.1', description, topic)
+        #     _set_injected_property('overview', 'str', '0.1', description, topic, enums)
 
 
-def _set_injected_property(name, typeof, cardinality, description, topic):
+def _set_injected_property(name, typeof, cardinality, description, topic, enums):
     """Injects a property into the set of specializations.
 
     """
     try:
-        enums = topic.spec.ENUMERATIONS
+        enumerations = topic.spec.ENUMERATIONS
     except AttributeError:
-        enums = topic.parent.spec.ENUMERATIONS
-    _set_property(name, typeof, cardinality, description, topic, enums, False, True)
+        enumerations = topic.parent.spec.ENUMERATIONS
+    _set_property(name, typeof, cardinality, description, topic, enumerations, enums, False, True)
 
 
-def _set_topic_from_module(topic, parent):
+def _set_topic_from_module(topic, parent, enums):
     """Set topic specialization attributes from a module.
 
     """
@@ -166,23 +173,23 @@ def _set_topic_from_module(topic, parent):
         for key, obj in topic.spec.DETAILS.items():
             # ... toplevel properties
             if key == "toplevel":
-                _set_property_collection(topic, obj, topic.spec.ENUMERATIONS)
+                _set_property_collection(topic, obj, topic.spec.ENUMERATIONS, enums)
 
             # ... toplevel property sets
             elif key.startswith("toplevel"):
-                _set_property_set(topic, key, obj, topic.spec.ENUMERATIONS)
+                _set_property_set(topic, key, obj, topic.spec.ENUMERATIONS, enums)
 
             # ... sub-topic properties
             elif len(key.split(":")) == 1:
                 # Create sub-sub-processes.
-                _create_topic(obj, topic, key)
-                _set_property_collection(topic.sub_topics[-1], obj, topic.spec.ENUMERATIONS)
+                _create_topic(obj, topic, enums, key)
+                _set_property_collection(topic.sub_topics[-1], obj, topic.spec.ENUMERATIONS, enums)
 
             # ... sub-topic property sets
             elif len(key.split(":")) == 2:
                 for st in topic.sub_topics:
                     if st.name == key.split(":")[0]:
-                        _set_property_set(st, key, obj, topic.spec.ENUMERATIONS)
+                        _set_property_set(st, key, obj, topic.spec.ENUMERATIONS, enums)
 
 
 def _set_topic_from_dict(topic, parent, name):
@@ -198,7 +205,7 @@ def _set_topic_from_dict(topic, parent, name):
     topic.name = name
 
 
-def _set_property_set(owner, key, obj, enumerations):
+def _set_property_set(owner, key, obj, enumerations, enums):
     """Set attributes of a property-set attributes from a dictionary.
 
     """
@@ -208,41 +215,40 @@ def _set_property_set(owner, key, obj, enumerations):
     ps.key = key
     ps.name = key.split(":")[-1]
     ps.owner = owner
-    _set_property_collection(ps, obj, enumerations)
+    _set_property_collection(ps, obj, enumerations, enums)
 
     owner.property_sets.append(ps)
+    owner.invalidate_views()
 
     # Cache.
     cache_specialization(ps)
 
 
-def _set_property_collection(owner, obj, enumerations):
+def _set_property_collection(owner, obj, enumerations, enums):
     """Set a collection of topic properties from a dictionary.
 
     """
     for name, typeof, cardinality, description in obj.get('properties', []):
-        _set_property(name, typeof, cardinality, description, owner, enumerations, True, False)
+        _set_property(name, typeof, cardinality, description, owner, enumerations, enums, True, False)
 
 
-def _set_property(name, typeof, cardinality, description, owner, enumerations, append, was_injected):
+def _set_property(name, typeof, cardinality, description, owner, enumerations, enums, append, was_injected):
     """Returns a topic property.
 
     """
     p = PropertySpecialization()
     p.cardinality = cardinality
     p.description = description
-    p.enum = _create_enum(p, typeof, enumerations) if typeof.startswith("ENUM:") else None
+    p.enum = _create_enum(typeof, enumerations, enums) if typeof.startswith("ENUM:") else None
     p.id = "{}.{}".format(owner.id, name)
     p.was_injected = was_injected
     p.key = name
     p.name = name
     p.owner = owner
     p.typeof = typeof
+    p.compile_validator()
 
-    if append == True:
-        owner.properties.append(p)
-    else:
-        owner.properties.insert(0, p)
+    owner.add_property(p, prepend=not append)
 
     # Cache.
     cache_specialization(p)
@@ -254,23 +260,29 @@ def _set_property(name, typeof, cardinality, description, owner, enumerations, a
     return p
 
 
-def _create_enum(detail, typeof, enumerations):
-    """Creates & returns an enumeration specialzation wrapper.
+def _create_enum(typeof, enumerations, enums):
+    """Returns an enumeration specialzation wrapper shared by all properties of the same type.
 
     """
     key = typeof.split(":")[-1]
+    try:
+        return enums[(id(enumerations), key)][-1]
+    except KeyError:
+        pass
+
     obj = enumerations[key]
 
     e = EnumSpecialization()
     e.description = obj['description']
-    e.detail = detail
-    e.id = "{}.{}".format(detail.id, key)
+    e.id = key
     e.is_open = obj['is_open']
     e.label = key
     e.name = key
-    e.id = key
     e.choices = [_create_enum_choice(e, i[0], i[1]) for i in obj.get('members', [])]
 
+    # N.B. enumerations are retained so that their id cannot be recycled.
+    enums[(id(enumerations), key)] = (enumerations, e)
+
     return e
 
 
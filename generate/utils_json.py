@@ -0,0 +1,211 @@
+"""
+.. module:: utils_json.py
+   :license: GPL/CeCIL
+   :platform: Unix, Windows
+   :synopsis: JSON encoding backends & incremental JSON encoding to a stream.
+
+.. moduleauthor:: Mark Conway-Greenslade <momipsl@ipsl.jussieu.fr>
+
+
+"""
+import json
+from json.encoder import encode_basestring_ascii
+
+try:
+    import simplejson
+except ImportError:
+    simplejson = None
+
+
+
+# Separators emitted by the standard library whether or not output is indented.
+_SEPARATORS = (', ', ': ')
+
+
+def _dumps_stdlib(obj, indent):
+    """Encodes JSON using standard library.
+
+    """
+    return json.dumps(obj, indent=indent, separators=_SEPARATORS)
+
+
+def _dumps_simplejson(obj, indent):
+    """Encodes JSON using simplejson - options are pinned so that output is identical to standard library.
+
+    """
+    return simplejson.dumps(obj, indent=indent, separators=_SEPARATORS,
+                            namedtuple_as_object=False, tuple_as_array=True,
+                            use_decimal=False, for_json=False, iterable_as_array=False)
+
+
+# Map of backend names to encoders.
+BACKENDS = {
+    'stdlib': _dumps_stdlib
+}
+if simplejson is not None:
+    BACKENDS['simplejson'] = _dumps_simplejson
+
+# Active backend - fastest installed.
+_BACKEND = {
+    'name': 'simplejson' if simplejson is not None else 'stdlib'
+}
+
+
+def get_backend():
+    """Returns name of active JSON encoding backend.
+
+    :rtype: str
+
+    """
+    return _BACKEND['name']
+
+
+def set_backend(name):
+    """Sets active JSON encoding backend.
+
+    :param str name: Backend name, either 'auto' (fastest installed), 'stdlib' or 'simplejson'.
+
+    """
+    if name == 'auto':
+        name = 'simplejson' if simplejson is not None else 'stdlib'
+    if name not in BACKENDS:
+        raise ValueError("JSON backend is not installed: {}".format(name))
+    _BACKEND['name'] = name
+
+
+def dumps_scalar(value):
+    """Encodes a scalar as JSON.
+
+    N.B. strings & constants are encoded directly as every backend encodes them identically.
+
+    :param object value: A JSON encodable scalar.
+
+    :rtype: str
+
+    """
+    if isinstance(value, basestring):
+        return encode_basestring_ascii(value)
+    elif value is None:
+        return 'null'
+    elif value is True:
+        return 'true'
+    elif value is False:
+        return 'false'
+
+    return dumps(value)
+
+
+def dumps(obj, indent=None):
+    """Encodes an object as JSON using active backend.
+
+    :param object obj: Object to be encoded.
+    :param int indent: Number of spaces by which nested members are indented.
+
+    :rtype: str
+
+    """
+    return BACKENDS[_BACKEND['name']](obj, indent)
+
+
+class JsonStreamWriter(object):
+    """Writes JSON to a stream one member at a time.
+
+    Output is identical to that of json.dumps(obj, indent=N), however only the stack of open
+    containers is held in memory.
+
+    """
+    def __init__(self, stream, indent=4, level=0):
+        """Instance constructor.
+
+        :param file stream: Stream to which JSON is written.
+        :param int indent: Number of spaces by which nested members are indented.
+        :param int level: Nesting level at which writing starts - used when a fragment is to be embedded.
+
+        """
+        self.stream = stream
+        self.indent = indent
+        self.level = level
+        self._counts = []
+
+
+    def begin_object(self, key=None):
+        """Opens an object.
+
+        :param str key: Member key if the object is a member of an enclosing object.
+
+        """
+        self._write_prefix(key)
+        self.stream.write("{")
+        self._counts.append(0)
+
+
+    def end_object(self):
+        """Closes the innermost open object.
+
+        """
+        self._write_suffix("}")
+
+
+    def begin_array(self, key=None):
+        """Opens an array.
+
+        :param str key: Member key if the array is a member of an enclosing object.
+
+        """
+        self._write_prefix(key)
+        self.stream.write("[")
+        self._counts.append(0)
+
+
+    def end_array(self):
+        """Closes the innermost open array.
+
+        """
+        self._write_suffix("]")
+
+
+    def write_value(self, value, key=None):
+        """Writes a scalar value.
+
+        :param object value: A JSON encodable scalar.
+        :param str key: Member key if the value is a member of an enclosing object.
+
+        """
+        self._write_prefix(key)
+        self.stream.write(dumps_scalar(value))
+
+
+    def write_raw(self, text, key=None):
+        """Writes an already encoded value, e.g. a fragment written by a writer of the same nesting level.
+
+        :param str text: Encoded JSON.
+        :param str key: Member key if the value is a member of an enclosing object.
+
+        """
+        self._write_prefix(key)
+        self.stream.write(text)
+
+
+    def _write_prefix(self, key):
+        """Writes separator, newline & indentation preceding a member.
+
+        """
+        if self._counts:
+            if self._counts[-1]:
+                self.stream.write(", ")
+            self._counts[-1] += 1
+            self.stream.write("\n")
+            self.stream.write(" " * self.indent * (self.level + len(self._counts)))
+        if key is not None:
+            self.stream.write(dumps_scalar(key))
+            self.stream.write(": ")
+
+
+    def _write_suffix(self, delimiter):
+        """Writes closing delimiter of innermost open container.
+
+        """
+        if self._counts.pop():
+            self.stream.write("\n")
+            self.stream.write(" " * self.indent * (self.level + len(self._counts)))
+        self.stream.write(delimiter)
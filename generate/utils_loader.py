@@ -71,11 +71,28 @@ def _get_modules(input_dir, typeof):
     modules = sorted([i for i in os.listdir(input_dir) if _is_target(i)])
     modules = [os.path.join(input_dir, m) for m in modules]
     modules = [(m.split("/")[-1].split(".")[0], m) for m in modules]
-    modules = [imp.load_source(i, j) for i, j in modules]
+    modules = [_load_module(i, j) for i, j in modules]
 
     return modules
 
 
+def _load_module(name, fpath):
+    """Returns a specialization module loaded from source.
+
+    N.B. Modules are not registered in sys.modules as same named modules of
+    different MIP eras must not overwrite one another.
+
+    """
+    with open(fpath, 'r') as fstream:
+        code = compile(fstream.read(), fpath, 'exec')
+
+    module = imp.new_module(name)
+    module.__file__ = fpath
+    exec code in module.__dict__
+
+    return module
+
+
 def _get_module(modules, name):
     """Returns a specialization module.
 
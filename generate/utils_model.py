@@ -10,17 +10,43 @@
 
 """
 import inspect
+import types
 from itertools import chain
 
 from utils_constants import *
 
 
 
+# Set of type keys of topics that may occur more than once within a parent.
+_TYPE_KEYS_COLLECTIONS = {TYPE_KEY_PROCESS, TYPE_KEY_SUBPROCESS}
+
+
 class TopicSpecialization(object):
     """Wraps a topic specialization.
 
     """
-    def __init__(self, spec, parent):
+    __slots__ = (
+        'authors',
+        'change_history',
+        'contact',
+        'contributors',
+        'description',
+        'id',
+        'name',
+        'numbering',
+        'ordinal',
+        'parent',
+        'properties',
+        'property_sets',
+        'spec',
+        'sub_topics',
+        'type_key',
+        '_properties_by_name',
+        '_sub_topics_by_type_key',
+        '_views'
+        )
+
+    def __init__(self, spec, parent, key=None):
         """Instance initializer.
 
         """
@@ -31,15 +57,21 @@ class TopicSpecialization(object):
         self.description = None
         self.id = None
         self.name = None
+        self.numbering = None
+        self.ordinal = None
         self.parent = parent
         self.properties = []
         self.property_sets = []
         self.spec = spec
         self.sub_topics = []
-        try:
+        self.type_key = _get_topic_type_key(spec, parent, key)
+        self._properties_by_name = {}
+        self._sub_topics_by_type_key = {}
+        self._views = {}
+        if parent is not None:
             parent.sub_topics.append(self)
-        except AttributeError:
-            pass
+            parent._sub_topics_by_type_key.setdefault(self.type_key, []).append(self)
+            parent.invalidate_views()
 
 
     def __repr__(self):
@@ -49,13 +81,35 @@ class TopicSpecialization(object):
         return self.id
 
 
+    def __getstate__(self):
+        """Instance pickling state - module specs are reduced to their public attributes.
+
+        """
+        state = _get_slot_state(self)
+        state['_views'] = {}
+        if inspect.ismodule(self.spec):
+            state['spec'] = _ModuleState(self.spec)
+
+        return state
+
+
+    def __setstate__(self, state):
+        """Instance unpickling handler.
+
+        """
+        if isinstance(state['spec'], _ModuleState):
+            state['spec'] = state['spec'].get_module()
+        _set_slot_state(self, state)
+
+
     def __getitem__(self, type_key):
         """Returns a child topic.
 
         """
-        result = [i for i in self.sub_topics if i.type_key == type_key]
+        # N.B. copied so that callers cannot mutate the index.
+        result = list(self._sub_topics_by_type_key.get(type_key, ()))
 
-        if type_key in {TYPE_KEY_PROCESS, TYPE_KEY_SUBPROCESS}:
+        if type_key in _TYPE_KEYS_COLLECTIONS:
             return result
         elif len(result) > 1:
             return result
@@ -71,30 +125,6 @@ class TopicSpecialization(object):
         return self.id.split('.')
 
 
-    @property
-    def type_key(self):
-        """Gets associated type key.
-
-        """
-        if self.parent is None:
-            return TYPE_KEY_REALM
-        elif self.id.endswith('.grid'):
-            return TYPE_KEY_GRID
-        elif self.id.endswith('.key_properties'):
-            return TYPE_KEY_KEYPROPS
-
-
-        elif inspect.ismodule(self.spec):
-            if self.spec.__name__.endswith('_grid'):
-                return TYPE_KEY_GRID
-            elif self.spec.__name__.endswith('_key_properties'):
-                return TYPE_KEY_KEYPROPS
-            else:
-                return TYPE_KEY_PROCESS
-        elif isinstance(self.spec, dict):
-            return TYPE_KEY_SUBPROCESS
-
-
     @property
     def name_camel_case(self):
         """Gets camel case formatted name.
@@ -116,14 +146,10 @@ class TopicSpecialization(object):
         """Returns a flattened topic hierarchy.
 
         """
-        def _get(container):
-            result = [container]
-            for topic in container.sub_topics:
-                result += _get(topic)
-
-            return result
+        def _get():
+            return (self, ) + tuple(chain.from_iterable(i.all_topics for i in self.sub_topics))
 
-        return _get(self)
+        return self._get_view('all_topics', _get)
 
 
     @property
@@ -131,11 +157,14 @@ class TopicSpecialization(object):
         """Returns flattened list of all property containers, i.e. topics & proeprty-sets.
 
         """
-        result = []
-        for t in self.all_topics:
-            result += [t] + t.property_sets
+        def _get():
+            result = []
+            for t in self.all_topics:
+                result += [t] + t.property_sets
 
-        return [i for i in result if i.properties]
+            return tuple(i for i in result if i.properties)
+
+        return self._get_view('all_property_containers', _get)
 
 
     @property
@@ -151,7 +180,10 @@ class TopicSpecialization(object):
         """Returns all specialization properties.
 
         """
-        return set(chain.from_iterable(i.properties for i in self.all_property_containers))
+        def _get():
+            return frozenset(chain.from_iterable(i.properties for i in self.all_property_containers))
+
+        return self._get_view('all_properties', _get)
 
 
     @property
@@ -159,7 +191,10 @@ class TopicSpecialization(object):
         """Returns all required specialization properties.
 
         """
-        return set([i for i in self.all_properties if i.is_required])
+        def _get():
+            return frozenset(i for i in self.all_properties if i.is_required)
+
+        return self._get_view('all_required_properties', _get)
 
 
     @property
@@ -167,7 +202,10 @@ class TopicSpecialization(object):
         """Returns all optional specialization properties.
 
         """
-        return self.all_properties - self.all_required_properties
+        def _get():
+            return self.all_properties - self.all_required_properties
+
+        return self._get_view('all_optional_properties', _get)
 
 
     @property
@@ -203,17 +241,70 @@ class TopicSpecialization(object):
         return _map_id_to_names(self.id, offset, seperator, convertor)
 
 
+    def invalidate_views(self):
+        """Discards memoized hierarchy views - must be called whenever hierarchy is mutated.
+
+        N.B. views of ancestors are also discarded as they encompass this topic.
+
+        """
+        topic = self
+        while topic is not None:
+            topic._views.clear()
+            topic = topic.parent
+
+
+    def _get_view(self, key, factory):
+        """Returns a memoized hierarchy view, deriving it upon first access.
+
+        N.B. views are shared and so are immutable, i.e. tuples & frozensets.
+
+        """
+        try:
+            return self._views[key]
+        except KeyError:
+            self._views[key] = factory()
+            return self._views[key]
+
+
     def has_property(self, identifier):
         """Returns a flag indicating whether a topic supports a property.
 
         """
-        return True if identifier in {i.name for i in self.properties} else False
+        return identifier in self._properties_by_name
+
+
+    def add_property(self, prop, prepend=False):
+        """Adds a property to the managed collection.
+
+        :param PropertySpecialization prop: Property being added.
+        :param bool prepend: Flag indicating whether property is to be inserted at head of collection.
+
+        """
+        if prepend:
+            self.properties.insert(0, prop)
+        else:
+            self.properties.append(prop)
+        self._properties_by_name[prop.name] = prop
+        self.invalidate_views()
 
 
 class PropertySetSpecialization(object):
     """Wraps a property set specialization.
 
     """
+    __slots__ = (
+        'description',
+        'id',
+        'key',
+        'name',
+        'ordinal',
+        'owner',
+        'properties',
+        'property_sets',
+        'topic',
+        'type_key'
+        )
+
     def __init__(self):
         """Instance initializer.
 
@@ -222,7 +313,9 @@ class PropertySetSpecialization(object):
 
         self.description = None
         self.id = None
+        self.key = None
         self.name = None
+        self.ordinal = None
         self.owner = None
         self.properties = []
         self.property_sets = []
@@ -237,6 +330,28 @@ class PropertySetSpecialization(object):
         return self.id
 
 
+    def add_property(self, prop, prepend=False):
+        """Adds a property to the managed collection.
+
+        :param PropertySpecialization prop: Property being added.
+        :param bool prepend: Flag indicating whether property is to be inserted at head of collection.
+
+        """
+        if prepend:
+            self.properties.insert(0, prop)
+        else:
+            self.properties.append(prop)
+        self.invalidate_views()
+
+
+    def invalidate_views(self):
+        """Discards memoized hierarchy views of owning topic.
+
+        """
+        if self.owner is not None:
+            self.owner.invalidate_views()
+
+
     @property
     def are_cim_properties(self):
         """Gets flag indicating whether property is injected from CIM.
@@ -272,6 +387,22 @@ class PropertySpecialization(object):
     """Wraps a property specialization.
 
     """
+    __slots__ = (
+        'cardinality',
+        'description',
+        'enum',
+        'id',
+        'key',
+        'name',
+        'ordinal',
+        'owner',
+        'topic',
+        'typeof',
+        'type_key',
+        'validator',
+        'was_injected'
+        )
+
     def __init__(self):
         """Instance initializer.
 
@@ -282,11 +413,14 @@ class PropertySpecialization(object):
         self.description = None
         self.enum = None
         self.id = None
+        self.key = None
         self.name = None
+        self.ordinal = None
         self.owner = None
         self.topic = None
         self.typeof = None
         self.type_key = "property"
+        self.validator = None
         self.was_injected = False
 
 
@@ -297,6 +431,24 @@ class PropertySpecialization(object):
         return self.id
 
 
+    def __getstate__(self):
+        """Instance pickling state - validator is recompiled upon unpickling.
+
+        """
+        state = _get_slot_state(self)
+        state['validator'] = None
+
+        return state
+
+
+    def __setstate__(self, state):
+        """Instance unpickling handler.
+
+        """
+        _set_slot_state(self, state)
+        self.compile_validator()
+
+
     @property
     def name_camel_case(self):
         """Gets camel case formatted name.
@@ -374,36 +526,44 @@ class PropertySpecialization(object):
         return result
 
 
-    def validate_value(self, val):
-        """Validates a property value.
-
-        :param object val: Value to be validated.
+    def compile_validator(self):
+        """Compiles the value validator - must be called once type & enum have been assigned.
 
         """
         if self.enum:
-            self.enum.validate_value(val)
+            self.validator = self.enum.compile_validator()
+        else:
+            self.validator = _VALUE_VALIDATORS.get(self.typeof, _validate_any)
 
-        if self.typeof in {'str', 'cs-str', 'l-str'}:
-            if not isinstance(val, basestring) or not len(val.strip()):
-                raise ValueError("Invalid value: must be a non zero length string")
+        return self.validator
 
-        if self.typeof == 'bool':
-            if not isinstance(val, bool):
-                raise ValueError("Invalid value: must be a boolean")
 
-        if self.typeof == 'int':
-            if not isinstance(val, int):
-                raise ValueError("Invalid value: must be an integer")
+    def validate_value(self, val):
+        """Validates a property value.
+
+        :param object val: Value to be validated.
 
-        if self.typeof == 'float':
-            if not isinstance(val, float):
-                raise ValueError("Invalid value: must be a float")
+        """
+        (self.validator or self.compile_validator())(val)
 
 
 class EnumSpecialization(object):
     """Wraps an enumeration specialization.
 
     """
+    __slots__ = (
+        'choices',
+        'description',
+        'id',
+        'is_open',
+        'label',
+        'name',
+        'ordinal',
+        'type_key',
+        'validator',
+        '_values'
+        )
+
     def __init__(self):
         """Instance initializer.
 
@@ -414,7 +574,10 @@ class EnumSpecialization(object):
         self.is_open = False
         self.label = None
         self.name = None
+        self.ordinal = None
         self.type_key = "enum"
+        self.validator = None
+        self._values = None
 
 
     def __repr__(self):
@@ -431,13 +594,52 @@ class EnumSpecialization(object):
         return iter(self.choices)
 
 
+    def __getstate__(self):
+        """Instance pickling state - derived members are recomputed upon demand.
+
+        """
+        state = _get_slot_state(self)
+        state['validator'] = None
+        state['_values'] = None
+
+        return state
+
+
+    def __setstate__(self, state):
+        """Instance unpickling handler.
+
+        """
+        _set_slot_state(self, state)
+
+
+    @property
+    def values(self):
+        """Gets set of choice values.
+
+        """
+        if self._values is None:
+            self._values = frozenset(i.value for i in self.choices)
+
+        return self._values
+
+
     def is_a_member(self, val):
         """Returns flag indicating whether vlue is a member of the enumeration.
 
         :param object val: Value to be validated.
 
         """
-        return val in [i.value for i in self.choices]
+        return val in self.values
+
+
+    def compile_validator(self):
+        """Compiles the value validator - must be called once choices have been assigned.
+
+        """
+        if self.validator is None:
+            self.validator = _get_enum_validator(self.values, self.is_open)
+
+        return self.validator
 
 
     def validate_value(self, val):
@@ -446,23 +648,23 @@ class EnumSpecialization(object):
         :param object val: Value to be validated.
 
         """
-        if not isinstance(val, basestring) or not len(val.strip()):
-            raise ValueError("Invalid value: must be a non zero length string")
-        if self.is_a_member(val):
-            return
-        if not self.is_open:
-            raise ValueError("Invalid value: is not an enumeration member")
-        if not val.startswith("Other: "):
-            raise ValueError("Invalid value: new enumeration members must be prefixed with: 'Other: '")
-        other = val.split("Other: ")[-1]
-        if self.is_a_member(other):
-            raise ValueError("Invalid value: enumeration member already defined")
+        (self.validator or self.compile_validator())(val)
 
 
 class EnumChoiceSpecialization(object):
     """Wraps an enumeration choice specialization.
 
     """
+    __slots__ = (
+        'description',
+        'enum',
+        'id',
+        'is_other',
+        'ordinal',
+        'type_key',
+        'value'
+        )
+
     def __init__(self):
         """Instance initializer.
 
@@ -470,6 +672,7 @@ class EnumChoiceSpecialization(object):
         self.description = None
         self.enum = None
         self.id = None
+        self.ordinal = None
         self.value = None
         self.type_key = "enum-choice"
 
@@ -487,6 +690,16 @@ class ShortTable(object):
     """Wraps s short-table, i.e. a grouped subset of specializations.
 
     """
+    __slots__ = (
+        'authors',
+        'change_history',
+        'contact',
+        'contributors',
+        'label',
+        'name',
+        'properties'
+        )
+
     def __init__(self):
         """Instance initializer.
 
@@ -511,6 +724,11 @@ class ShortTableProperty(object):
     """Wraps a grouped set of specializations related to a short table.
 
     """
+    __slots__ = (
+        'identifier',
+        'priority'
+        )
+
     def __init__(self):
         """Instance initializer.
 
@@ -519,6 +737,142 @@ class ShortTableProperty(object):
         self.priority = None
 
 
+def _validate_any(val):
+    """Validates a value of an unconstrained type.
+
+    """
+    pass
+
+
+def _validate_bool(val):
+    """Validates a boolean value.
+
+    """
+    if not isinstance(val, bool):
+        raise ValueError("Invalid value: must be a boolean")
+
+
+def _validate_float(val):
+    """Validates a float value.
+
+    """
+    if not isinstance(val, float):
+        raise ValueError("Invalid value: must be a float")
+
+
+def _validate_int(val):
+    """Validates an integer value.
+
+    """
+    if not isinstance(val, int):
+        raise ValueError("Invalid value: must be an integer")
+
+
+def _validate_str(val):
+    """Validates a string value.
+
+    """
+    if not isinstance(val, basestring) or not len(val.strip()):
+        raise ValueError("Invalid value: must be a non zero length string")
+
+
+# Map of property types to value validators.
+_VALUE_VALIDATORS = {
+    'bool': _validate_bool,
+    'cs-str': _validate_str,
+    'float': _validate_float,
+    'int': _validate_int,
+    'l-str': _validate_str,
+    'str': _validate_str
+}
+
+
+def _get_enum_validator(members, is_open):
+    """Returns a validator of values against a set of enum choices.
+
+    """
+    def _validate(val):
+        _validate_str(val)
+        if val in members:
+            return
+        if not is_open:
+            raise ValueError("Invalid value: is not an enumeration member")
+        if not val.startswith("Other: "):
+            raise ValueError("Invalid value: new enumeration members must be prefixed with: 'Other: '")
+        if val.split("Other: ")[-1] in members:
+            raise ValueError("Invalid value: enumeration member already defined")
+
+    return _validate
+
+
+def _get_topic_type_key(spec, parent, key):
+    """Returns type key of a topic specialization.
+
+    """
+    if parent is None:
+        return TYPE_KEY_REALM
+
+    if inspect.ismodule(spec):
+        name = spec.__name__.split(".")[-1]
+        if key is None:
+            key = "_".join(name.split("_")[1:])
+    if key == 'grid':
+        return TYPE_KEY_GRID
+    elif key == 'key_properties':
+        return TYPE_KEY_KEYPROPS
+
+    elif inspect.ismodule(spec):
+        if name.endswith('_grid'):
+            return TYPE_KEY_GRID
+        elif name.endswith('_key_properties'):
+            return TYPE_KEY_KEYPROPS
+        else:
+            return TYPE_KEY_PROCESS
+    elif isinstance(spec, dict):
+        return TYPE_KEY_SUBPROCESS
+
+
+def _get_slot_state(obj):
+    """Returns pickling state of a slotted instance, i.e. a map of assigned slots to values.
+
+    """
+    return {i: getattr(obj, i) for i in obj.__slots__ if hasattr(obj, i)}
+
+
+def _set_slot_state(obj, state):
+    """Assigns unpickled state to a slotted instance.
+
+    """
+    for k, v in state.items():
+        setattr(obj, k, v)
+
+
+class _ModuleState(object):
+    """Picklable state of a specialization module.
+
+    """
+    def __init__(self, module):
+        """Instance initializer.
+
+        """
+        self.name = module.__name__
+        self.fpath = module.__file__
+        self.attributes = {k: v for k, v in vars(module).items()
+                           if k.isupper() and not k.startswith('_')}
+
+
+    def get_module(self):
+        """Returns a module reconstituted from managed state.
+
+        """
+        result = types.ModuleType(self.name)
+        result.__file__ = self.fpath
+        for k, v in self.attributes.items():
+            setattr(result, k, v)
+
+        return result
+
+
 def _map_id_to_names(identifier, offset=None, seperator=" --> ", convertor=None):
     """Returns a set of topic names mapped from a specialization id.
 
@@ -0,0 +1,198 @@
+"""
+.. module:: utils_numbering.py
+   :license: GPL/CeCIL
+   :platform: Unix, Windows
+   :synopsis: Dense integer numbering of a specialization graph with array backed attributes.
+
+.. moduleauthor:: Mark Conway-Greenslade <momipsl@ipsl.jussieu.fr>
+
+
+"""
+import array
+
+from utils_model import PropertySetSpecialization
+
+
+
+# Node kind codes.
+KIND_TOPIC = 0
+KIND_PROPERTY_SET = 1
+KIND_PROPERTY = 2
+KIND_ENUM = 3
+KIND_ENUM_CHOICE = 4
+
+# Set of cardinalities in code order - others are coded upon first encounter.
+CARDINALITIES = ('0.1', '1.1', '0.N', '1.N')
+
+# Code denoting an absent value within an integer column.
+NULL = -1
+
+
+class SpecializationNumbering(object):
+    """Dense integer numbering of a specialization graph.
+
+    Every topic, property set, property, enum and enum choice is assigned an ordinal, i.e. an
+    index into a set of contiguous column arrays.  Enums are numbered once per module as their
+    identifiers are only unique within a module, hence their identifiers are qualified by the
+    identifier of the topic whose module declares them, e.g. cmip6.ocnbgchem.tracers:phytoplankton_types.
+
+    """
+    def __init__(self):
+        """Instance constructor.
+
+        """
+        self.cardinalities = list(CARDINALITIES)
+        self.identifiers = []
+        self.ordinals = {}
+        self.typeofs = []
+        self._codes = {
+            'cardinality': {v: k for k, v in enumerate(CARDINALITIES)},
+            'typeof': {}
+        }
+
+        # Columns.
+        self.kinds = array.array('b')
+        self.owners = array.array('i')
+        self.enums = array.array('i')
+        self.typeof_codes = array.array('h')
+        self.cardinality_codes = array.array('b')
+
+
+    def __len__(self):
+        """Returns number of numbered nodes.
+
+        """
+        return len(self.identifiers)
+
+
+    def get_ordinal(self, identifier):
+        """Returns ordinal of a node.
+
+        :param str identifier: Node identifier.
+
+        :rtype: int
+
+        """
+        return self.ordinals[identifier.lower()]
+
+
+    def get_identifier(self, ordinal):
+        """Returns identifier of a node.
+
+        :param int ordinal: Node ordinal.
+
+        :rtype: str
+
+        """
+        return self.identifiers[ordinal]
+
+
+    def get_ordinals(self, kind):
+        """Returns ordinals of all nodes of a kind.
+
+        :param int kind: Node kind code.
+
+        :rtype: list
+
+        """
+        return [i for i, k in enumerate(self.kinds) if k == kind]
+
+
+    def add(self, identifier, kind, owner=NULL, enum=NULL, typeof=None, cardinality=None):
+        """Numbers a node & returns its ordinal.
+
+        :param str identifier: Node identifier.
+        :param int kind: Node kind code.
+        :param int owner: Ordinal of owning node.
+        :param int enum: Ordinal of associated enum.
+        :param str typeof: Property type.
+        :param str cardinality: Property cardinality.
+
+        :rtype: int
+
+        """
+        ordinal = len(self.identifiers)
+        self.identifiers.append(identifier)
+        self.ordinals[identifier.lower()] = ordinal
+        self.kinds.append(kind)
+        self.owners.append(owner)
+        self.enums.append(enum)
+        self.typeof_codes.append(self._get_code('typeof', self.typeofs, typeof))
+        self.cardinality_codes.append(self._get_code('cardinality', self.cardinalities, cardinality))
+
+        return ordinal
+
+
+    def _get_code(self, column, table, value):
+        """Returns code of a value, extending code table upon first encounter.
+
+        """
+        if value is None:
+            return NULL
+
+        codes = self._codes[column]
+        try:
+            return codes[value]
+        except KeyError:
+            codes[value] = len(table)
+            table.append(value)
+            return codes[value]
+
+
+def number_specialization(root):
+    """Assigns a dense integer ordinal to every node within a specialization graph.
+
+    :param TopicSpecialization root: Root of specialization graph.
+
+    :returns: Numbering of specialization graph.
+    :rtype: SpecializationNumbering
+
+    """
+    result = SpecializationNumbering()
+    for topic in root.all_topics:
+        topic.ordinal = result.add(
+            topic.id, KIND_TOPIC, _get_ordinal(topic.parent))
+        _number_properties(result, topic)
+        for prop_set in topic.property_sets:
+            prop_set.ordinal = result.add(
+                prop_set.id, KIND_PROPERTY_SET, topic.ordinal)
+            _number_properties(result, prop_set)
+
+    return result
+
+
+def _number_properties(numbering, owner):
+    """Numbers a container's properties together with enums upon first encounter.
+
+    """
+    for prop in owner.properties:
+        enum = NULL
+        if prop.enum is not None:
+            if prop.enum.ordinal is None:
+                _number_enum(numbering, prop)
+            enum = prop.enum.ordinal
+        prop.ordinal = numbering.add(
+            prop.id, KIND_PROPERTY, owner.ordinal, enum, prop.typeof, prop.cardinality)
+
+
+def _number_enum(numbering, prop):
+    """Numbers an enum & its choices.
+
+    """
+    topic = prop.owner.owner if isinstance(prop.owner, PropertySetSpecialization) else prop.owner
+    while isinstance(topic.spec, dict):
+        topic = topic.parent
+
+    enum = prop.enum
+    identifier = "{}:{}".format(topic.id, enum.id)
+    enum.ordinal = numbering.add(identifier, KIND_ENUM, topic.ordinal)
+    for choice in enum:
+        choice.ordinal = numbering.add(
+            "{}.{}".format(identifier, choice.value), KIND_ENUM_CHOICE, enum.ordinal, enum.ordinal)
+
+
+def _get_ordinal(node):
+    """Returns ordinal of a node or null if node is undefined.
+
+    """
+    return NULL if node is None else node.ordinal
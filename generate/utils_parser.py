@@ -9,6 +9,8 @@
 
 
 """
+import StringIO
+
 from utils_constants import *
 
 
@@ -232,3 +234,106 @@ class SpecializationParser(object):
 
         """
         pass
+
+
+class StreamingSpecializationParser(SpecializationParser):
+    """A parser whose outputs are written as parse events arrive.
+
+    Each output is written either to an output stream (see set_output_stream) or to an
+    in-memory buffer returned by get_output.
+
+    """
+    def __init__(self, project, root, short_tables):
+        """Instance constructor.
+
+        """
+        super(StreamingSpecializationParser, self).__init__(project, root, short_tables)
+
+        self._streams = {}
+
+
+    def set_output_stream(self, stream, output_type=None):
+        """Sets stream to which an output is written as it is generated.
+
+        :param file stream: Output stream.
+        :param str output_type: Type of output - only required if parser generates multiple outputs.
+
+        """
+        self._streams[output_type] = stream
+
+
+    def get_output(self, output_type=None):
+        """Returns generated output as a text blob - empty if written to an output stream.
+
+        :param str output_type: Type of output - only required if parser generates multiple outputs.
+
+        """
+        stream = self._streams.get(output_type)
+        if isinstance(stream, _BufferStream):
+            return stream.getvalue()
+
+        return ""
+
+
+    def get_output_stream(self, output_type=None):
+        """Returns stream to which an output is written, defaulting to an in-memory buffer.
+
+        :param str output_type: Type of output - only required if parser generates multiple outputs.
+
+        """
+        try:
+            return self._streams[output_type]
+        except KeyError:
+            self._streams[output_type] = _BufferStream()
+            return self._streams[output_type]
+
+
+class _BufferStream(StringIO.StringIO):
+    """In-memory stream to which output is written when no output stream has been set.
+
+    """
+    pass
+
+
+class SpecializationParserGroup(SpecializationParser):
+    """Walks a specialization once broadcasting each parse event to a group of parsers.
+
+    """
+    def __init__(self, project, root, short_tables, parsers=None):
+        """Instance constructor.
+
+        """
+        super(SpecializationParserGroup, self).__init__(project, root, short_tables)
+
+        self.parsers = []
+        for parser in parsers or []:
+            self.register(parser)
+
+
+    def register(self, parser):
+        """Registers a parser to which parse events will be broadcast.
+
+        :param SpecializationParser parser: A parser, typically a generator.
+
+        """
+        self.parsers.append(parser)
+        for name in _EVENTS:
+            setattr(self, name, self._get_broadcaster(name))
+
+
+    def _get_broadcaster(self, name):
+        """Returns an event handler that broadcasts to the overridden handlers of registered parsers.
+
+        """
+        handlers = [getattr(i, name) for i in self.parsers]
+        handlers = [i for i in handlers if getattr(i, '__func__', None) is not _EVENTS[name]]
+
+        def _broadcast(obj):
+            for handler in handlers:
+                handler(obj)
+
+        return _broadcast
+
+
+# Map of parse event names to default (no-op) handlers.
+_EVENTS = {k: v for k, v in vars(SpecializationParser).items() if k.startswith('on_')}
@@ -0,0 +1,175 @@
+"""
+.. module:: utils_snapshot.py
+   :license: GPL/CeCIL
+   :platform: Unix, Windows
+   :synopsis: Persists hydrated specializations so that unchanged inputs need not be re-processed.
+
+.. moduleauthor:: Mark Conway-Greenslade <momipsl@ipsl.jussieu.fr>
+
+
+"""
+import cPickle
+import glob
+import hashlib
+import os
+import tempfile
+
+from utils_cache import set_topic_specialization as cache_specialization
+from utils_factory import get_short_tables
+from utils_factory import get_specialization
+from utils_loader import get_modules
+from utils_loader import get_short_tables_definitions
+
+
+
+# Snapshot format version - increment whenever snapshot layout changes.
+_VERSION = "3"
+
+# Flag passed to MoveFileEx so that an existing snapshot is replaced (Windows only).
+_MOVEFILE_REPLACE_EXISTING = 0x1
+
+# Set of generator modules whose source alters the hydrated graph.
+_GENERATOR_MODULES = (
+    "utils_constants.py",
+    "utils_factory.py",
+    "utils_model.py",
+    "utils_numbering.py",
+    "utils_snapshot.py"
+)
+
+
+def get_specialization_snapshot(input_dir, typeof, snapshot_dir=None):
+    """Returns a specialization & associated short tables, reusing a snapshot when inputs are unchanged.
+
+    :param str input_dir: Directory within which modules reside.
+    :param str typeof: Type of specialization being processed.
+    :param str snapshot_dir: Directory within which snapshot is persisted.
+
+    :returns: 2 member tuple: specialization, short tables.
+    :rtype: tuple
+
+    """
+    fpath = get_snapshot_path(snapshot_dir or input_dir, typeof)
+    key = get_snapshot_key(input_dir, typeof)
+
+    # Reuse snapshot if inputs are unchanged.
+    snapshot = _read(fpath, key)
+    if snapshot is not None:
+        cache_specialization(snapshot[0])
+        return snapshot
+
+    # Otherwise hydrate from source & persist.
+    specialization = get_specialization(get_modules(input_dir, typeof))
+    short_tables = get_short_tables(get_short_tables_definitions(input_dir, typeof))
+    try:
+        _write(fpath, key, (specialization, short_tables))
+    except (IOError, OSError):
+        pass
+
+    return specialization, short_tables
+
+
+def get_snapshot_path(snapshot_dir, typeof):
+    """Returns path to a specialization snapshot file.
+
+    :param str snapshot_dir: Directory within which snapshot is persisted.
+    :param str typeof: Type of specialization being processed.
+
+    """
+    return os.path.join(snapshot_dir, "_{}.snapshot".format(typeof))
+
+
+def get_snapshot_key(input_dir, typeof):
+    """Returns a content hash over the inputs from which a specialization is derived.
+
+    :param str input_dir: Directory within which modules reside.
+    :param str typeof: Type of specialization being processed.
+
+    """
+    fpaths = [os.path.join(input_dir, i) for i in os.listdir(input_dir) if _is_source(i, typeof)]
+    fpaths += glob.glob(os.path.join(input_dir, "short_tables", "{}_*.json".format(typeof)))
+    fpaths += [os.path.join(os.path.dirname(__file__), i) for i in _GENERATOR_MODULES]
+
+    # N.B. input directory is hashed as it determines specialization identifiers.
+    result = hashlib.sha1(_VERSION)
+    result.update(os.path.abspath(input_dir))
+    for fpath in sorted(fpaths):
+        result.update(fpath.split("/")[-1])
+        with open(fpath, 'rb') as fstream:
+            result.update(fstream.read())
+
+    return result.hexdigest()
+
+
+def _is_source(fname, typeof):
+    """Returns flag indicating whether a file is a specialization source module.
+
+    """
+    return not fname.startswith('_') and \
+           fname.endswith('.py') and \
+           fname.startswith(typeof)
+
+
+def _read(fpath, key):
+    """Returns snapshot contents if snapshot key matches.
+
+    """
+    if not os.path.exists(fpath):
+        return None
+
+    try:
+        with open(fpath, 'rb') as fstream:
+            unpickler = cPickle.Unpickler(fstream)
+            if unpickler.load() != key:
+                return None
+            return unpickler.load()
+    except (EOFError, cPickle.UnpicklingError, AttributeError, ImportError,
+            IndexError, KeyError, TypeError, ValueError, IOError, OSError):
+        return None
+
+
+def _write(fpath, key, snapshot):
+    """Writes snapshot contents preceded by snapshot key.
+
+    N.B. contents are written to a uniquely named temporary file which then replaces the snapshot,
+    so that concurrent writers never interleave & readers never see a partially written snapshot.
+
+    """
+    fd, fpath_tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(fpath)), suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as fstream:
+            pickler = cPickle.Pickler(fstream, cPickle.HIGHEST_PROTOCOL)
+            pickler.dump(key)
+            pickler.dump(snapshot)
+
+        # N.B. mkstemp creates owner only files whereas snapshots are shared like any other generated file.
+        os.chmod(fpath_tmp, 0o666 & ~_get_umask())
+        _replace(fpath_tmp, fpath)
+    finally:
+        if os.path.exists(fpath_tmp):
+            os.remove(fpath_tmp)
+
+
+def _get_umask():
+    """Returns process file mode creation mask.
+
+    """
+    result = os.umask(0)
+    os.umask(result)
+
+    return result
+
+
+def _replace(src, dst):
+    """Renames a file, replacing destination if it exists.
+
+    """
+    if os.name != 'nt':
+        os.rename(src, dst)
+        return
+
+    # N.B. os.rename fails on Windows if destination exists.
+    import ctypes
+
+    if not ctypes.windll.kernel32.MoveFileExW(unicode(src), unicode(dst), _MOVEFILE_REPLACE_EXISTING):
+        raise OSError(ctypes.GetLastError(), "Snapshot could not be replaced: {}".format(dst))
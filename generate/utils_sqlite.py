@@ -0,0 +1,232 @@
+"""
+.. module:: utils_sqlite.py
+   :license: GPL/CeCIL
+   :platform: Unix, Windows
+   :synopsis: Read access to a SQLite specialization index.
+
+.. moduleauthor:: Mark Conway-Greenslade <momipsl@ipsl.jussieu.fr>
+
+
+"""
+import sqlite3
+import threading
+
+from utils_model import EnumChoiceSpecialization
+from utils_model import EnumSpecialization
+from utils_model import PropertySetSpecialization
+from utils_model import PropertySpecialization
+from utils_model import TopicSpecialization
+
+
+
+# Index schema.
+SCHEMA = """
+CREATE TABLE topics (
+    key TEXT PRIMARY KEY,
+    id TEXT NOT NULL,
+    parent_key TEXT,
+    name TEXT NOT NULL,
+    type_key TEXT NOT NULL,
+    description TEXT
+);
+CREATE TABLE property_sets (
+    key TEXT PRIMARY KEY,
+    id TEXT NOT NULL,
+    owner_key TEXT NOT NULL,
+    name TEXT NOT NULL,
+    description TEXT
+);
+CREATE TABLE properties (
+    key TEXT PRIMARY KEY,
+    id TEXT NOT NULL,
+    owner_key TEXT NOT NULL,
+    name TEXT NOT NULL,
+    typeof TEXT NOT NULL,
+    cardinality TEXT NOT NULL,
+    description TEXT,
+    was_injected INTEGER NOT NULL,
+    enum_ordinal INTEGER
+);
+CREATE TABLE enums (
+    ordinal INTEGER PRIMARY KEY,
+    id TEXT NOT NULL,
+    name TEXT NOT NULL,
+    description TEXT,
+    is_open INTEGER NOT NULL
+);
+CREATE TABLE enum_choices (
+    enum_ordinal INTEGER NOT NULL,
+    ordinal INTEGER NOT NULL,
+    value TEXT NOT NULL,
+    description TEXT,
+    PRIMARY KEY (enum_ordinal, ordinal)
+);
+CREATE TABLE short_tables (
+    name TEXT PRIMARY KEY,
+    label TEXT
+);
+CREATE TABLE short_table_properties (
+    short_table TEXT NOT NULL,
+    ordinal INTEGER NOT NULL,
+    identifier TEXT NOT NULL,
+    priority INTEGER,
+    PRIMARY KEY (short_table, ordinal)
+);
+CREATE INDEX properties_owner ON properties (owner_key);
+CREATE INDEX property_sets_owner ON property_sets (owner_key);
+CREATE INDEX topics_parent ON topics (parent_key);
+"""
+
+
+class SpecializationIndex(object):
+    """Answers specialization lookups from a SQLite index without executing specialization modules.
+
+    """
+    def __init__(self, fpath):
+        """Instance constructor.
+
+        :param str fpath: Path to SQLite index file.
+
+        """
+        self.fpath = fpath
+        self._enums = {}
+        self._local = threading.local()
+        self._properties = {}
+
+
+    @property
+    def connection(self):
+        """Gets a connection to the index - one per thread as connections cannot be shared.
+
+        """
+        try:
+            return self._local.connection
+        except AttributeError:
+            self._local.connection = sqlite3.connect(self.fpath)
+            self._local.connection.text_factory = str
+            return self._local.connection
+
+
+    def get_property(self, specialization_id):
+        """Returns a property specialization.
+
+        N.B. property is detached, i.e. it has no owner within a specialization hierarchy.
+
+        :param str specialization_id: Specialization identifier.
+
+        :rtype: PropertySpecialization
+
+        """
+        key = specialization_id.lower()
+        try:
+            return self._properties[key]
+        except KeyError:
+            pass
+
+        row = self.connection.execute(
+            "SELECT id, name, typeof, cardinality, description, was_injected, enum_ordinal "
+            "FROM properties WHERE key = ?", (key, )
+            ).fetchone()
+        if row is None:
+            raise KeyError(specialization_id)
+
+        p = PropertySpecialization()
+        p.id, p.name, p.typeof, p.cardinality, p.description, p.was_injected, enum_ordinal = row
+        p.key = p.name
+        p.was_injected = bool(p.was_injected)
+        p.enum = None if enum_ordinal is None else self._get_enum(enum_ordinal)
+        p.compile_validator()
+        self._properties[key] = p
+
+        return p
+
+
+    def get_specialization(self, specialization_id):
+        """Returns a property, property set or topic specialization.
+
+        N.B. property sets & topics are detached and bare, i.e. they carry neither properties nor sub-topics.
+
+        :param str specialization_id: Specialization identifier.
+
+        :rtype: PropertySpecialization | PropertySetSpecialization | TopicSpecialization
+
+        """
+        try:
+            return self.get_property(specialization_id)
+        except KeyError:
+            pass
+
+        key = specialization_id.lower()
+        row = self.connection.execute(
+            "SELECT id, name, description FROM property_sets WHERE key = ?", (key, )
+            ).fetchone()
+        if row is not None:
+            ps = PropertySetSpecialization()
+            ps.id, ps.name, ps.description = row
+            ps.key = ps.name
+            return ps
+
+        row = self.connection.execute(
+            "SELECT id, name, type_key, description FROM topics WHERE key = ?", (key, )
+            ).fetchone()
+        if row is not None:
+            t = TopicSpecialization(None, None)
+            t.id, t.name, t.type_key, t.description = row
+            return t
+
+        raise KeyError(specialization_id)
+
+
+    def get_property_ids(self, prefix=""):
+        """Returns identifiers of all properties, optionally filtered by identifier prefix.
+
+        :param str prefix: Identifier prefix.
+
+        :rtype: list
+
+        """
+        return [i[0] for i in self.connection.execute(
+            "SELECT id FROM properties WHERE key >= ? AND key < ? ORDER BY key",
+            (prefix.lower(), prefix.lower() + "\xff")
+            )]
+
+
+    def get_required_property_ids(self, prefix=""):
+        """Returns identifiers of properties that must be documented, optionally filtered by identifier prefix.
+
+        :param str prefix: Identifier prefix.
+
+        :rtype: list
+
+        """
+        return [i for i in self.get_property_ids(prefix) if self.get_property(i).is_required]
+
+
+    def _get_enum(self, ordinal):
+        """Returns an enumeration specialization shared by all properties of that type.
+
+        """
+        try:
+            return self._enums[ordinal]
+        except KeyError:
+            pass
+
+        e = EnumSpecialization()
+        e.id, e.name, e.description, e.is_open = self.connection.execute(
+            "SELECT id, name, description, is_open FROM enums WHERE ordinal = ?", (ordinal, )
+            ).fetchone()
+        e.is_open = bool(e.is_open)
+        e.label = e.name
+        e.choices = []
+        for value, description in self.connection.execute(
+            "SELECT value, description FROM enum_choices WHERE enum_ordinal = ? ORDER BY ordinal", (ordinal, )
+            ):
+            ec = EnumChoiceSpecialization()
+            ec.description = description
+            ec.enum = e
+            ec.id = "{}.{}".format(e.id, value)
+            ec.value = value
+            e.choices.append(ec)
+        self._enums[ordinal] = e
+
+        return e
@@ -0,0 +1,183 @@
+"""
+.. module:: utils_trie.py
+   :license: GPL/CeCIL
+   :platform: Unix, Windows
+   :synopsis: Prefix trie over dotted specialization identifiers.
+
+.. moduleauthor:: Mark Conway-Greenslade <momipsl@ipsl.jussieu.fr>
+
+
+"""
+
+
+
+class SpecializationTrie(object):
+    """Prefix trie over specialization identifiers, one node per dotted identifier segment.
+
+    """
+    def __init__(self, specializations=()):
+        """Instance constructor.
+
+        :param iterable specializations: Specializations to be indexed.
+
+        """
+        self._root = _TrieNode()
+        for spec in specializations:
+            self.add(spec)
+
+
+    def __len__(self):
+        """Returns number of indexed specializations.
+
+        """
+        return self._root.count
+
+
+    def add(self, spec):
+        """Indexes a specialization by its identifier.
+
+        :param object spec: Specialization with an id attribute.
+
+        """
+        node = self._root
+        path = [node]
+        for segment in spec.id.lower().split('.'):
+            try:
+                node = node.children[segment]
+            except KeyError:
+                child = _TrieNode()
+                node.children[segment] = child
+                node = child
+            path.append(node)
+
+        if node.spec is None:
+            for i in path:
+                i.count += 1
+        node.spec = spec
+
+
+    def get(self, prefix):
+        """Returns specialization whose identifier is exactly the prefix.
+
+        :param str prefix: Specialization identifier.
+
+        :rtype: object | None
+
+        """
+        node = self._get_node(prefix)
+
+        return None if node is None else node.spec
+
+
+    def get_count(self, prefix):
+        """Returns number of specializations within a subtree, excluding the subtree root.
+
+        :param str prefix: Identifier of subtree root.
+
+        :rtype: int
+
+        """
+        node = self._get_node(prefix)
+        if node is None:
+            return 0
+
+        return node.count - (0 if node.spec is None else 1)
+
+
+    def get_subtree(self, prefix):
+        """Returns specializations within a subtree, including the subtree root, in identifier order.
+
+        :param str prefix: Identifier of subtree root.
+
+        :rtype: list
+
+        """
+        node = self._get_node(prefix)
+        if node is None:
+            return []
+
+        result = []
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            if node.spec is not None:
+                result.append(node.spec)
+            stack += [node.children[i] for i in sorted(node.children, reverse=True)]
+
+        return result
+
+
+    def resolve(self, partial):
+        """Returns identifiers that a partial identifier may resolve to.
+
+        All segments but the last are matched exactly whilst the last is matched as a prefix,
+        e.g. cmip6.ocnbgchem.key_properties.gas resolves to cmip6.ocnbgchem.key_properties.gas_exchange.
+
+        :param str partial: Partial specialization identifier.
+
+        :returns: Matching identifiers in identifier order.
+        :rtype: list
+
+        """
+        segments = partial.lower().split('.')
+        node = self._get_node('.'.join(segments[0:-1]))
+        if node is None:
+            return []
+
+        result = []
+        for segment in sorted(node.children):
+            if not segment.startswith(segments[-1]):
+                continue
+            child = node.children[segment]
+            if child.spec is not None:
+                result.append(child.spec.id)
+            else:
+                result += [i.id for i in _get_shallowest(child)]
+
+        return result
+
+
+    def _get_node(self, prefix):
+        """Returns node at a prefix.
+
+        """
+        node = self._root
+        if not prefix:
+            return node
+        for segment in prefix.lower().split('.'):
+            try:
+                node = node.children[segment]
+            except KeyError:
+                return None
+
+        return node
+
+
+class _TrieNode(object):
+    """A trie node.
+
+    """
+    __slots__ = ('children', 'count', 'spec')
+
+    def __init__(self):
+        """Instance constructor.
+
+        """
+        self.children = {}
+        self.count = 0
+        self.spec = None
+
+
+def _get_shallowest(node):
+    """Returns specializations nearest to a node that has no specialization of its own.
+
+    """
+    result = []
+    for segment in sorted(node.children):
+        child = node.children[segment]
+        if child.spec is not None:
+            result.append(child.spec)
+        else:
+            result += _get_shallowest(child)
+
+    return result
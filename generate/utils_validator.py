@@ -0,0 +1,283 @@
+"""
+.. module:: utils_validator.py
+   :license: GPL/CeCIL
+   :platform: Unix, Windows
+   :synopsis: Validates model documents against specializations in bulk.
+
+.. moduleauthor:: Mark Conway-Greenslade <momipsl@ipsl.jussieu.fr>
+
+
+"""
+import collections
+import itertools
+import multiprocessing
+import time
+
+from utils_cache import get_property_specialization
+from utils_cache import get_required_property_ids
+from utils_cache import set_topic_specialization
+from utils_model import PropertySpecialization
+
+
+
+# Validator used within a worker process.
+_WORKER_VALIDATOR = None
+
+
+def validate_documents(documents, specialization, processes=None, chunk_size=256, stats=None):
+    """Validates a stream of model documents across a pool of worker processes.
+
+    The hydrated specialization is placed in cache before workers are created, so that forked
+    workers share it read-only rather than each loading it.
+
+    :param iterable documents: Model documents, each a map of specialization identifiers to values.
+    :param TopicSpecialization specialization: Hydrated specialization against which documents are validated.
+    :param int processes: Number of worker processes (defaults to cpu count).
+    :param int chunk_size: Number of documents dispatched to a worker at a time.
+    :param ValidationStatistics stats: Statistics to be updated as documents are validated.
+
+    :returns: Generator yielding validation errors per document in input order.
+    :rtype: generator
+
+    """
+    processes = processes or multiprocessing.cpu_count()
+    stats = stats or ValidationStatistics()
+    chunks = _get_chunks(documents, chunk_size)
+
+    set_topic_specialization(specialization)
+    pool = multiprocessing.Pool(processes, _init_worker, (specialization, ))
+    stats.start()
+    try:
+        # N.B. number of chunks in flight is bounded so as to stream large inputs.
+        pending = collections.deque()
+        for chunk in itertools.islice(chunks, processes * 2):
+            pending.append(pool.apply_async(_validate_chunk, (chunk, )))
+        while pending:
+            results, values = pending.popleft().get()
+            for chunk in itertools.islice(chunks, 1):
+                pending.append(pool.apply_async(_validate_chunk, (chunk, )))
+            stats.documents += len(results)
+            stats.errors += sum(len(i) for i in results)
+            stats.values += values
+            for errors in results:
+                yield errors
+    finally:
+        # N.B. pool is closed rather than terminated as terminating whilst a chunk is being dispatched
+        # deadlocks (python 2.7) - chunks in flight are bounded so closing completes promptly.
+        stats.stop()
+        pool.close()
+        pool.join()
+
+
+def _get_chunks(documents, chunk_size):
+    """Yields successive chunks of a stream of documents.
+
+    """
+    documents = iter(documents)
+    while True:
+        chunk = list(itertools.islice(documents, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _init_worker(specialization):
+    """Initialises a worker process.
+
+    N.B. if forked the specialization is inherited already cached, otherwise it is cached upon receipt.
+
+    """
+    global _WORKER_VALIDATOR
+
+    set_topic_specialization(specialization)
+    _WORKER_VALIDATOR = DocumentValidator()
+
+
+def _validate_chunk(documents):
+    """Validates a chunk of documents within a worker process.
+
+    """
+    values = _WORKER_VALIDATOR.stats.values
+    results = [_WORKER_VALIDATOR.validate(i) for i in documents]
+
+    return results, _WORKER_VALIDATOR.stats.values - values
+
+
+class DocumentValidator(object):
+    """Validates model documents, i.e. maps of specialization identifiers to a value or list of values.
+
+    """
+    def __init__(self):
+        """Instance constructor.
+
+        """
+        self.stats = ValidationStatistics()
+        self._plans = {}
+        self._required = {}
+
+
+    def validate(self, document):
+        """Validates a model document.
+
+        :param dict document: Map of specialization identifiers to values.
+
+        :returns: Validation errors sorted by specialization id, each a 2 member tuple: specialization id, error message.
+        :rtype: list
+
+        """
+        errors = []
+        documented = set()
+        topics = set()
+        values = 0
+        plans = self._plans
+        for identifier, value in document.iteritems():
+            # Resolve plan.
+            try:
+                plan = plans[identifier]
+            except KeyError:
+                plan = self._get_plan(identifier)
+            if plan.__class__ is str:
+                errors.append((identifier, plan))
+                continue
+            key, topic_key, validator, is_collection, is_required = plan
+            documented.add(key)
+            topics.add(topic_key)
+
+            # Validate cardinality.
+            if value is None or value == []:
+                if is_required:
+                    errors.append((identifier, "value is required"))
+                continue
+            if value.__class__ is list or value.__class__ is tuple:
+                if not is_collection and len(value) > 1:
+                    errors.append((identifier, "value must be single valued"))
+            else:
+                value = (value, )
+
+            # Validate type.
+            values += len(value)
+            for val in value:
+                try:
+                    validator(val)
+                except ValueError as err:
+                    errors.append((identifier, str(err)))
+
+        # Validate required properties have been documented.
+        for topic_key in topics:
+            missing = self._get_required(topic_key) - documented
+            errors += [(i, "value is required") for i in missing]
+
+        # N.B. sorted so that errors are independent of document key order.
+        errors.sort()
+
+        self.stats.documents += 1
+        self.stats.errors += len(errors)
+        self.stats.values += values
+
+        return errors
+
+
+    def validate_all(self, documents):
+        """Validates a stream of model documents.
+
+        :param iterable documents: Model documents, each a map of specialization identifiers to values.
+
+        :returns: Generator yielding validation errors per document.
+        :rtype: generator
+
+        """
+        self.stats.start()
+        try:
+            for document in documents:
+                yield self.validate(document)
+        finally:
+            self.stats.stop()
+
+
+    def _get_plan(self, identifier):
+        """Returns validation plan for a specialization identifier, or an error message if it cannot be resolved.
+
+        """
+        # N.B. only failures due to identifier shape are reported as unknown, loader failures propagate.
+        try:
+            prop = get_property_specialization(identifier)
+        except (IndexError, KeyError, UnicodeError):
+            prop = None
+        if prop is None:
+            return "unknown specialization identifier"
+        elif not isinstance(prop, PropertySpecialization):
+            plan = "specialization identifier is not a property"
+        else:
+            plan = (
+                prop.id.lower(),
+                ".".join(prop.id.lower().split(".")[0:2]),
+                prop.validator or prop.compile_validator(),
+                prop.is_collection,
+                prop.is_required
+                )
+
+        # N.B. only canonical identifiers are memoized so that memory is bounded by the specializations
+        # rather than by the number of distinct (unknown or case variant) identifiers streamed.
+        if identifier == prop.id or identifier == prop.id.lower():
+            self._plans[identifier] = plan
+
+        return plan
+
+
+    def _get_required(self, topic_key):
+        """Returns set of identifiers of properties that must be documented for a topic.
+
+        """
+        try:
+            return self._required[topic_key]
+        except KeyError:
+            self._required[topic_key] = get_required_property_ids(*topic_key.split("."))
+
+            return self._required[topic_key]
+
+
+class ValidationStatistics(object):
+    """Counters & timings accumulated whilst validating model documents.
+
+    """
+    def __init__(self):
+        """Instance constructor.
+
+        """
+        self.documents = 0
+        self.errors = 0
+        self.values = 0
+        self.elapsed = 0.0
+        self._started = None
+
+
+    def __repr__(self):
+        """Instance representation.
+
+        """
+        return "{} documents ({} values) validated in {:.3f}s :: {:.0f} documents/s :: {} errors".format(
+            self.documents, self.values, self.elapsed, self.throughput, self.errors)
+
+
+    @property
+    def throughput(self):
+        """Gets number of documents validated per second.
+
+        """
+        return self.documents / self.elapsed if self.elapsed else 0.0
+
+
+    def start(self):
+        """Starts timing.
+
+        """
+        self._started = time.time()
+
+
+    def stop(self):
+        """Stops timing.
+
+        """
+        if self._started is not None:
+            self.elapsed += time.time() - self._started
+            self._started = None
@@ -0,0 +1,61 @@
+"""
+.. module:: utils_xml.py
+   :license: GPL/CeCIL
+   :platform: Unix, Windows
+   :synopsis: Incremental XML encoding to a stream.
+
+.. moduleauthor:: Mark Conway-Greenslade <momipsl@ipsl.jussieu.fr>
+
+
+"""
+import xml.etree.ElementTree as ET
+
+
+
+class XmlStreamWriter(object):
+    """Writes XML to a stream one element at a time.
+
+    Output is identical to that of ET.tostring(root), however only the stack of open
+    elements is held in memory.
+
+    """
+    def __init__(self, stream):
+        """Instance constructor.
+
+        :param file stream: Stream to which XML is written.
+
+        """
+        self.stream = stream
+        self._tags = []
+
+
+    def begin(self, element):
+        """Opens an element, writing its start tag followed by its current sub-elements.
+
+        N.B. an opened element is always closed by an end tag, even if it has no sub-elements.
+
+        :param ET.Element element: Element to be opened - text & tail are not supported.
+
+        """
+        head = ET.tostring(ET.Element(element.tag, element.attrib))
+        self.stream.write(head[0:-3])
+        self.stream.write(">")
+        for child in element:
+            self.write(child)
+        self._tags.append(element.tag)
+
+
+    def end(self):
+        """Closes innermost open element.
+
+        """
+        self.stream.write("</{}>".format(self._tags.pop()))
+
+
+    def write(self, element):
+        """Writes a complete element.
+
+        :param ET.Element element: Element to be written.
+
+        """
+        self.stream.write(ET.tostring(element))
@@ -0,0 +1,167 @@
+"""
+.. module:: validate_documents.py
+   :license: GPL/CeCIL
+   :platform: Unix, Windows
+   :synopsis: Validates model documents streamed as newline delimited JSON.
+
+.. moduleauthor:: Mark Conway-Greenslade <momipsl@ipsl.jussieu.fr>
+
+
+"""
+import argparse
+import collections
+import json
+import os
+import sys
+
+# N.B. specialization model resides within sibling generate directory.
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "generate"))
+
+from utils_snapshot import get_specialization_snapshot
+from utils_validator import DocumentValidator
+from utils_validator import ValidationStatistics
+from utils_validator import validate_documents
+
+
+
+# Define command line options.
+_ARGS = argparse.ArgumentParser("Validates a stream of CMIP6 model documents encoded as newline delimited JSON.")
+_ARGS.add_argument(
+    "--typeof",
+    help="Type of specializations against which documents are validated.",
+    dest="typeof",
+    type=str,
+    default=os.path.dirname(os.path.dirname(os.path.abspath(__file__))).split("/")[-1][22:]
+    )
+_ARGS.add_argument(
+    "--input",
+    help="Path to a directory in which specializations reside.",
+    dest="input_dir",
+    type=str,
+    default=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    )
+_ARGS.add_argument(
+    "--documents",
+    help="Path to a newline delimited JSON file of model documents (defaults to stdin).",
+    dest="documents",
+    type=str,
+    default="-"
+    )
+_ARGS.add_argument(
+    "--output",
+    help="Path to a file into which newline delimited JSON results are written (defaults to stdout).",
+    dest="output",
+    type=str,
+    default="-"
+    )
+_ARGS.add_argument(
+    "--processes",
+    help="Number of worker processes across which documents are validated (defaults to validating in-process).",
+    dest="processes",
+    type=int,
+    default=1
+    )
+
+
+# Validation errors of a record that is not a JSON object.
+_RECORD_ERRORS = [("", "record must be a JSON object")]
+
+
+def _validate(istream, ostream, validator):
+    """Validates model documents one line at a time, writing a result per line as it is validated.
+
+    """
+    validator.stats.start()
+    try:
+        for idx, line in enumerate(istream, 1):
+            if not line.strip():
+                continue
+            try:
+                document = json.loads(line)
+            except ValueError:
+                document = None
+            if isinstance(document, dict):
+                errors = validator.validate(document)
+            else:
+                errors = _RECORD_ERRORS
+            _write_result(ostream, idx, errors)
+    finally:
+        validator.stats.stop()
+
+
+def _validate_in_parallel(istream, ostream, specialization, processes, stats):
+    """Validates model documents across worker processes, writing a result per line in input order.
+
+    """
+    # Line numbers of records dispatched to workers, each flagged if record is not a JSON object.
+    dispatched = collections.deque()
+
+    def _get_documents():
+        for idx, line in enumerate(istream, 1):
+            if not line.strip():
+                continue
+            try:
+                document = json.loads(line)
+            except ValueError:
+                document = None
+            is_record = isinstance(document, dict)
+            dispatched.append((idx, is_record))
+            yield document if is_record else {}
+
+    # N.B. closed explicitly so that worker processes are terminated even if writing fails.
+    results = validate_documents(_get_documents(), specialization, processes, stats=stats)
+    try:
+        for errors in results:
+            idx, is_record = dispatched.popleft()
+            if not is_record:
+                errors = _RECORD_ERRORS
+                stats.documents -= 1
+            _write_result(ostream, idx, errors)
+    finally:
+        results.close()
+
+
+def _write_result(ostream, idx, errors):
+    """Writes a validation result.
+
+    """
+    ostream.write(json.dumps({
+        "line": idx,
+        "isValid": len(errors) == 0,
+        "errors": [{"id": i, "message": j} for i, j in errors]
+        }, sort_keys=True))
+    ostream.write("\n")
+
+
+def _open(fpath, mode, default):
+    """Returns a file stream, defaulting to standard stream if path is '-'.
+
+    """
+    return default if fpath == "-" else open(fpath, mode)
+
+
+if __name__ == "__main__":
+    args = _ARGS.parse_args()
+
+    # Load specializations into cache.
+    specialization, _ = get_specialization_snapshot(args.input_dir, args.typeof)
+
+    # Stream results.
+    istream = _open(args.documents, "r", sys.stdin)
+    ostream = _open(args.output, "w", sys.stdout)
+    try:
+        if args.processes > 1:
+            stats = ValidationStatistics()
+            _validate_in_parallel(istream, ostream, specialization, args.processes, stats)
+        else:
+            validator = DocumentValidator()
+            stats = validator.stats
+            _validate(istream, ostream, validator)
+    finally:
+        if istream is not sys.stdin:
+            istream.close()
+        if ostream is not sys.stdout:
+            ostream.close()
+
+    # Inform user.
+    sys.stderr.write("ES-DOC :: {}\n".format(stats))